@@ -0,0 +1,86 @@
+import time
+import numpy as np
+
+from group_table_checker import group_table_checker
+from workloads import cyclic_group, elementary_two_group
+
+# Timing comparisons for the checking engine, run from the shell:
+#
+#   python benchmark.py
+#
+# Times are process times in seconds, as in the app's time_test.
+
+#####################################################################
+# tables used by the benchmarks                                     #
+#####################################################################
+
+#--------------------------------------------------------------------#
+# the same table with each element i renamed to the string "g{i}"
+def relabel(X):
+    names=[f"g{i}" for i in X['elts']]
+    return {
+        'table': np.array(names)[X['table']],
+        'elts': names
+        }
+
+#####################################################################
+# benchmarks                                                        #
+#####################################################################
+
+#--------------------------------------------------------------------#
+# Translating a table of labels into a table of indices is done in
+# group_table_checker.__init__.  Compare tables with labels
+# list(range(n)), which need no translation, with tables of the same
+# order labelled by strings.
+def bench_labels(orders=(256,1024,2048,4096)):
+    print("labelled versus integer-labelled tables")
+    print(f"{'n':>6} {'int init':>10} {'label init':>11} {'int total':>10} {'label total':>12}")
+    for n in orders:
+        X=cyclic_group(n)
+        Y=relabel(X)
+        row=[]
+        for Z in (X,Y):
+            start_time=time.process_time()
+            G=group_table_checker(Z['elts'],Z['table'],test_mode=True)
+            init_time=time.process_time()-start_time
+            results=G.test_table()
+            assert results['is_group']
+            row.append((init_time,time.process_time()-start_time))
+        print(f"{n:>6} {row[0][0]:>10.4f} {row[1][0]:>11.4f} {row[0][1]:>10.4f} {row[1][1]:>12.4f}")
+
+
+#--------------------------------------------------------------------#
+# The (s,g,t) batches and the 'roadmap right' batches read columns of
+# the table, as rows of opT.  Compare the strided view op.T with a
+# C-contiguous copy, timing the (s,g,t) batches and the roadmap
+# batches (left and right together; only right reads opT) separately.
+def bench_transpose(tables=None):
+    if tables is None:
+        tables=[("(Z_2)^12",elementary_two_group(12)),
+                ("Z_4096",cyclic_group(4096)),
+                ("(Z_2)^13",elementary_two_group(13))]
+    print("strided opT view versus contiguous transposed copy")
+    print(f"{'table':>10} {'opT':>6} {'init':>8} {'S x S':>8} {'roadmap':>8}")
+    for name,X in tables:
+        for transpose_copy in (False,True):
+            start_time=time.process_time()
+            G=group_table_checker(X['elts'],X['table'],test_mode=True,
+                                  transpose_copy=transpose_copy)
+            init_time=time.process_time()-start_time
+            assert G.test_closure() and G.test_identity() and G.test_inverses()
+            assert G.find_roadmap()
+            G.prepare_batches()
+            S_batches=len(G.S)**2
+            start_time=time.process_time()
+            assert G.first_failure(0,S_batches) is None
+            S_time=time.process_time()-start_time
+            start_time=time.process_time()
+            assert G.first_failure(S_batches,G.number_of_batches) is None
+            roadmap_time=time.process_time()-start_time
+            layout="copy" if transpose_copy else "view"
+            print(f"{name:>10} {layout:>6} {init_time:>8.4f} {S_time:>8.4f} {roadmap_time:>8.4f}")
+
+
+if __name__=='__main__':
+    bench_labels()
+    bench_transpose()
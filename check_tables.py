@@ -0,0 +1,202 @@
+import argparse
+import concurrent.futures
+import csv
+import functools
+import json
+import os
+import numpy as np
+
+from group_table_checker import (group_table_checker, map_table, certificate,
+                                 save_certificate, load_certificate,
+                                 verify_certificate)
+
+# Check many tables from the shell, in parallel, printing one JSON
+# line of results per table:
+#
+#   python check_tables.py tables/ more_tables/x.csv ...
+#
+# Directories are searched (not recursively) for table files.
+# Supported formats:
+#
+# * .npy  : an n x n integer array; the elements are 0..n-1.
+#           The file is memory mapped rather than read in.
+#
+# * .json : {"elts": [...], "table": [[...],...]}, as in the
+#           dictionaries used by the app's test mode, or just the
+#           list of rows of an integer table with elements 0..n-1.
+#
+# * .csv  : n rows of n entries.  An extra first row, if present,
+#           lists the elements; otherwise the entries must be the
+#           integers 0..n-1.
+#
+# With --save-certificates DIR, the certificate of each group table
+# x.npy is written to DIR/x.npy.cert.npz (or .json).  With --verify
+# DIR, each table is checked against its certificate from DIR, by
+# verify_certificate, instead of from scratch.
+
+table_suffixes=('.npy','.json','.csv')
+
+# the results printed for each table, unless --full-results is given
+summary_fields=('is_group','failed_property','failed_triple',
+                'number_of_triples','timings')
+certificate_suffixes=('.npz','.json')
+
+#--------------------------------------------------------------------#
+# a table given as rows of labels; without element names the labels
+# must be the integers 0..n-1
+def table_from_rows(rows,elements=None):
+    if elements is None:
+        table=np.array(rows,dtype=int)
+        elements=list(range(len(rows)))
+    else:
+        table=np.array(rows)
+    return {
+        'table': table,
+        'elts': elements
+        }
+
+#--------------------------------------------------------------------#
+def read_table(path):
+    if path.endswith('.npy'):
+        table=map_table(path)
+        return {
+            'table': table,
+            'elts': list(range(table.shape[0]))
+            }
+    if path.endswith('.json'):
+        with open(path) as f:
+            X=json.load(f)
+        if isinstance(X,dict):
+            return table_from_rows(X['table'],X['elts'])
+        return table_from_rows(X)
+    if path.endswith('.csv'):
+        with open(path,newline='') as f:
+            rows=[row for row in csv.reader(f) if len(row)>0]
+        if (len(rows)>0) and (len(rows)==len(rows[0])+1):
+            return table_from_rows(rows[1:],rows[0])
+        return table_from_rows(rows)
+    raise ValueError(f"unknown table format: {path}")
+
+#--------------------------------------------------------------------#
+# numpy scalars and arrays, and dictionaries with non-string keys,
+# as something json can write
+def jsonable(x):
+    if isinstance(x,dict):
+        return {str(jsonable(k)):jsonable(v) for k,v in x.items()}
+    if isinstance(x,(list,tuple)):
+        return [jsonable(v) for v in x]
+    if isinstance(x,np.ndarray):
+        return jsonable(x.tolist())
+    if isinstance(x,np.generic):
+        return x.item()
+    return x
+
+#--------------------------------------------------------------------#
+# runs in a worker process; any error in one table is reported on
+# that table's line rather than stopping the whole run
+def check_file(path,random_rounds=0,seed=None,latin_square=False,
+               certificates=None,certificate_format='npz',full_results=False):
+    try:
+        X=read_table(path)
+        G=group_table_checker(X['elts'],X['table'],test_mode=True,
+                              random_rounds=random_rounds,seed=seed,
+                              latin_square=latin_square)
+        results=G.test_table()
+        if (certificates is not None) and results['is_group']:
+            save_certificate(certificate(results),
+                             certificate_path(path,certificates,'.'+certificate_format))
+        if not full_results:
+            results={key:results[key] for key in summary_fields if key in results}
+    except Exception as e:
+        results={'error':f"{type(e).__name__}: {e}"}
+    results['file']=path
+    return jsonable(results)
+
+#--------------------------------------------------------------------#
+# the certificate of the table file path in the directory certificates
+def certificate_path(path,certificates,suffix):
+    return os.path.join(certificates,os.path.basename(path)+'.cert'+suffix)
+
+#--------------------------------------------------------------------#
+# runs in a worker process: check the table file path against its
+# certificate.  Tables with named elements are first translated into
+# indices, as the certificate is.
+def verify_file(path,certificates):
+    try:
+        cert_paths=[certificate_path(path,certificates,suffix)
+                    for suffix in certificate_suffixes]
+        cert_paths=[cert_path for cert_path in cert_paths if os.path.exists(cert_path)]
+        if len(cert_paths)==0:
+            raise ValueError(f"no certificate for {path} in {certificates}")
+        cert=load_certificate(cert_paths[0])
+        X=read_table(path)
+        table=X['table']
+        if not ((X['elts']==list(range(len(X['elts'])))) and (table.dtype.kind in 'iu')):
+            table=group_table_checker(X['elts'],table,test_mode=True).op
+        results=verify_certificate(table,cert)
+    except Exception as e:
+        results={'error':f"{type(e).__name__}: {e}"}
+    results['file']=path
+    return jsonable(results)
+
+#--------------------------------------------------------------------#
+def table_files(paths):
+    files=[]
+    for path in paths:
+        if os.path.isdir(path):
+            for name in sorted(os.listdir(path)):
+                if name.endswith(table_suffixes):
+                    files.append(os.path.join(path,name))
+        else:
+            files.append(path)
+    return files
+
+#--------------------------------------------------------------------#
+def main(argv=None):
+    parser=argparse.ArgumentParser(
+        description="Test whether tables define groups, printing one JSON line per table.")
+    parser.add_argument('paths',nargs='+',
+                        help="table files (.npy, .json, .csv) or directories of them")
+    parser.add_argument('-j','--workers',type=int,default=os.cpu_count(),
+                        help="number of worker processes (default: number of cores)")
+    parser.add_argument('--chunksize',type=int,default=8,
+                        help="tables handed to a worker at a time")
+    parser.add_argument('--random-rounds',type=int,default=0,
+                        help="rounds of the random subsets test to run before the full check;"
+                        " a table which is not associative passes r rounds with probability"
+                        " at most (7/8)^r (default: 0)")
+    parser.add_argument('--seed',type=int,default=None,
+                        help="seed for the random subsets test")
+    parser.add_argument('--latin-square',action='store_true',
+                        help="reject tables which are not latin squares before the identity,"
+                        " inverses and associativity checks")
+    parser.add_argument('--full-results',action='store_true',
+                        help="print all the results of test_table, including the inverses,"
+                        " generators and roadmap of a group, rather than a summary")
+    parser.add_argument('--save-certificates',metavar='DIR',default=None,
+                        help="write the certificate of each group table to DIR")
+    parser.add_argument('--certificate-format',choices=['npz','json'],default='npz',
+                        help="format of the certificates written (default: npz)")
+    parser.add_argument('--verify',metavar='DIR',default=None,
+                        help="check each table against its certificate in DIR"
+                        " instead of from scratch")
+    args=parser.parse_args(argv)
+
+    files=table_files(args.paths)
+    if args.save_certificates is not None:
+        os.makedirs(args.save_certificates,exist_ok=True)
+    with concurrent.futures.ProcessPoolExecutor(max_workers=args.workers) as pool:
+        if args.verify is not None:
+            check=functools.partial(verify_file,certificates=args.verify)
+        else:
+            check=functools.partial(check_file,random_rounds=args.random_rounds,
+                                    seed=args.seed,latin_square=args.latin_square,
+                                    certificates=args.save_certificates,
+                                    certificate_format=args.certificate_format,
+                                    full_results=args.full_results)
+        for results in pool.map(check,files,chunksize=args.chunksize):
+            print(json.dumps(results),flush=True)
+
+
+if __name__=='__main__':
+    main()
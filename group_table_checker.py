@@ -0,0 +1,3008 @@
+import concurrent.futures
+import json
+import math
+import tempfile
+import threading
+import time
+import numpy as np  # numpy arrays seem fastest for table ops
+                    # particularly transpose
+
+# The checking engine, with no dependence on streamlit or matplotlib,
+# so that it can be imported by batch jobs:
+#
+#   from group_table_checker import group_table_checker
+#   results = group_table_checker(elements, table, test_mode=True).test_table()
+#
+# The streamlit app (st-group-table-checker.py) subclasses
+# group_table_checker and overrides the output hooks write, pause,
+# print_status and intro.  Here they do nothing, so with
+# test_mode=False the engine runs silently.
+#
+# using np array for group table makes things much faster
+# than the original code using lists
+#
+# table.max() gives max
+# table.min() gives min
+# so closure is easy
+#
+# comparing arrays: (a==b).all()
+# instead of list comprehension
+# [a[b[j]] for j in x]
+# use a[b[x]] with arrays
+#
+# column of array: a[:,j] but row of transpose is faster
+
+#--------------------------------------------------------------------#
+# The group table is stored as a table of indices of elements.  We use
+# the narrowest dtype which can hold the indices 0..n-1 together with
+# a value marking entries which are not elements: the largest uint8 or
+# uint16 value (which is >= n, so the closure test catches it), or -1
+# for int32.
+
+def index_dtype(n):
+    if n <= np.iinfo(np.uint8).max:
+        return np.uint8
+    if n <= np.iinfo(np.uint16).max:
+        return np.uint16
+    return np.int32
+
+def missing_index(dtype):
+    if np.dtype(dtype).kind=='u':
+        return np.iinfo(dtype).max
+    return -1
+
+# bytes allowed for temporary arrays while building the index table
+default_memory_budget = 1<<26
+
+# above this order we keep a C-contiguous copy of the transposed table,
+# so that its rows (the columns of the table) are contiguous in memory
+default_transpose_threshold = 1024
+
+#--------------------------------------------------------------------#
+# The random subsets test (Rajagopalan and Schulman): for random
+# subsets A,B,C of the elements, compare (AB)C with A(BC) in the group
+# algebra over GF(2).  An operation which is not associative fails a
+# round with probability at least 1/8, so passes r rounds with
+# probability at most (7/8)^r.
+
+def random_error_bound(rounds):
+    return (7/8)**rounds
+
+# the number of rounds for an error bound of at most error
+def rounds_for_error(error):
+    return max(1,math.ceil(math.log(error)/math.log(7/8)))
+
+#--------------------------------------------------------------------#
+# table[a,b] for index arrays a and b.  If the table is C-contiguous
+# (or its transpose is), looking up entry a*n+b of the flattened
+# table with np.take is much faster than 2-D fancy indexing.
+
+def gather(table,a,b):
+    n=table.shape[1]
+    if table.flags.c_contiguous:
+        return np.take(table.reshape(-1),np.multiply(a,n,dtype=np.intp)+b)
+    if table.T.flags.c_contiguous:
+        return np.take(table.T.reshape(-1),np.multiply(b,n,dtype=np.intp)+a)
+    return table[a,b]
+
+# gather for a memory mapped table: the entries are looked up in the
+# order they are stored, so the file is read from start to end
+# rather than a page at a time in the order a and b happen to be in.
+
+def gather_in_order(table,a,b):
+    keys=np.multiply(a,table.shape[1],dtype=np.intp)+b
+    order=np.argsort(keys,kind='stable')
+    entries=np.empty(len(keys),dtype=table.dtype)
+    entries[order]=np.take(table.reshape(-1),keys[order])
+    return entries
+
+#--------------------------------------------------------------------#
+# The transpose of a memory mapped (n x n) table, written to a scratch
+# file in directory (by default tempfile's, see TMPDIR) which is
+# deleted once the array is.  The view table.T would read a column
+# with a stride of n entries, a page of the file per entry, and a
+# copy in memory would be as big as the table, so we copy square
+# tiles of about memory_budget bytes, reading and writing both files
+# in runs of a tile's width.
+
+def transpose_file(table,memory_budget=default_memory_budget,directory=None):
+    n=table.shape[0]
+    transpose=np.memmap(tempfile.TemporaryFile(dir=directory),
+                        dtype=table.dtype,mode='w+',shape=(n,n))
+    width=max(1,min(n,math.isqrt(memory_budget//table.dtype.itemsize)))
+    for i in range(0,n,width):
+        for j in range(0,n,width):
+            transpose[j:j+width,i:i+width]=table[i:i+width,j:j+width].T
+    return transpose
+
+#--------------------------------------------------------------------#
+# raised by the checks once cancel() has been called, perhaps from
+# another thread
+
+class Cancelled(Exception):
+    pass
+
+#--------------------------------------------------------------------#
+# the colors in a palette (names, or #rrggbb strings) as an array of
+# RGB values
+
+color_rgb = {
+    "white":  (255,255,255),
+    "yellow": (255,255,0),
+    "pink":   (255,192,203),
+    "orange": (255,165,0),
+    "red":    (255,0,0),
+    }
+
+def palette_rgb(palette):
+    return np.array([color_rgb[c] if c in color_rgb else
+                     tuple(int(c[i:i+2],16) for i in (1,3,5))
+                     for c in palette],dtype=np.uint8)
+
+#####################################################################
+# code to test whether a (n x n) table defines a group, checking    #
+# only n^2 ish triples for associativity                            #
+#####################################################################
+class group_table_checker(object):
+
+    ##################################################################
+    #  array-backed containers for H, S, the queue and the roadmap   #
+    ##################################################################
+    class Subset(object):
+        # a set of indices 0..n-1 which remembers the order in which
+        # its elements were added
+        def __init__(self,n,dtype,capacity=None):
+            if capacity is None:
+                capacity=n
+            self.member = np.zeros(n,dtype=bool)
+            self.items  = np.empty(capacity,dtype=dtype)
+            self.size   = 0
+        def add(self,x):
+            self.member[x]=True
+            self.items[self.size]=x
+            self.size=self.size+1
+        def add_many(self,xs): # xs distinct and not yet members
+            self.member[xs]=True
+            self.items[self.size:self.size+len(xs)]=xs
+            self.size=self.size+len(xs)
+        def array(self):
+            return self.items[:self.size]
+        def __contains__(self,x):
+            return self.member[x]
+        def __len__(self):
+            return self.size
+        def __getitem__(self,i):
+            return self.items[:self.size][i]
+        def __iter__(self):
+            return iter(self.array().tolist())
+    #---------------------------------------------------------------#
+    class PairQueue(object):
+        # FIFO queue of (x,s) pairs; items head..tail-1 are waiting
+        def __init__(self,capacity,dtype):
+            self.x    = np.empty(capacity,dtype=dtype)
+            self.s    = np.empty(capacity,dtype=dtype)
+            self.head = 0
+            self.tail = 0
+        def push(self,x,s): # either of x and s may be an array
+            k=max(np.size(x),np.size(s))
+            self.x[self.tail:self.tail+k]=x
+            self.s[self.tail:self.tail+k]=s
+            self.tail=self.tail+k
+        def pop(self):
+            i=self.head
+            self.head=i+1
+            return self.x[i],self.s[i]
+        def pop_all(self):
+            i=self.head
+            self.head=self.tail
+            return self.x[i:self.tail],self.s[i:self.tail]
+        def size(self):
+            return self.tail-self.head
+    #---------------------------------------------------------------#
+    class Equations(object):
+        # list of equations x*y=z, in a structured array
+        def __init__(self,capacity,dtype):
+            self.eq   = np.zeros(capacity,dtype=[('x',dtype),('y',dtype),('z',dtype)])
+            self.size = 0
+        def add(self,x,y,z):
+            self.eq[self.size]=(x,y,z)
+            self.size=self.size+1
+        def add_many(self,x,y,z):
+            k=len(z)
+            self.eq['x'][self.size:self.size+k]=x
+            self.eq['y'][self.size:self.size+k]=y
+            self.eq['z'][self.size:self.size+k]=z
+            self.size=self.size+k
+        def array(self):
+            return self.eq[:self.size]
+        def __len__(self):
+            return self.size
+        def __getitem__(self,i):
+            return self.eq[:self.size][i]
+        def as_dicts(self):
+            return [{'x':x,'y':y,'z':z} for (x,y,z) in self.array().tolist()]
+
+    ##################################################################
+    # append to the roadmap, coloring the table                      #
+    ##################################################################
+    def roadmap_add(self,x,y,z):
+        self.roadmap.add(x,y,z)
+        if not self.test_mode:
+            self.cell_colors[x][y]=self.road_color
+        
+    ##################################################################
+    # take the next (x,s) pair off the queue, coloring the table     #
+    ##################################################################
+    def Queue_pop(self):
+        x,s=self.Queue.pop()
+        if not self.test_mode:
+            self.cell_colors[x][s]=self.crossed
+        return x,s
+    
+    ##################################################################
+    # add to H and S, putting the new pairs on the Queue             #
+    ##################################################################
+    def H_add(self,x):
+        self.H.add(x)
+        self.Queue.push(x,self.S.array())
+
+        if not self.suppress_output:
+            self.row_colors[x]=self.H_color
+            self.cell_colors[x]=self.H_color
+            self.cell_colors[x,self.S.array()]=self.Q_color
+            
+    #---------------------------------------------------------------#
+    def S_add(self,s):
+        self.S.add(s)
+        self.Queue.push(self.H.array(),s)
+
+        if not self.suppress_output:
+            self.col_colors[s]=self.S_color
+            self.cell_colors[:,s]=self.S_color
+            self.cell_colors[self.H.array(),s]=self.Q_color
+
+    ##################################################################
+    # H, S and the roadmap written out, formatted only when asked    #
+    # for rather than kept up to date as they grow                   #
+    ##################################################################
+    def set_string(self,name,X):
+        return f"${name}="+r"\{"+",".join(f"{self.element[x]}" for x in X)+r"\}$"
+
+    @property
+    def H_string(self):
+        return self.set_string("H",self.H)
+
+    @property
+    def S_string(self):
+        return self.set_string("S",self.S)
+
+    @property
+    def roadmap_string(self):
+        return self.roadmap_text(len(self.roadmap))
+
+    # the first k roadmap equations
+    def roadmap_text(self,k):
+        return "roadmap equations:\n\n"+"".join(
+            f"   - ${self.element[x]}*{self.element[y]}={self.element[z]}$\n"
+            for (x,y,z) in self.roadmap.array()[:k].tolist())
+
+    ##################################################################
+    # Initialize everything we need for testing the table.           #
+    #                                                                #
+    # The object, once initialized, should be stored in              #
+    # st.session_state so we can resume computation after            #
+    # a button press or other interaction                            #
+    ##################################################################
+    def __init__(self,element,table, test_mode=False,
+                 memory_budget=default_memory_budget, compact=True,
+                 workers=1, chunk_entries=1<<20, transpose_copy=None,
+                 random_rounds=0, seed=None, latin_square=False,
+                 scratch_dir=None):
+        self.test_mode    = test_mode
+        self.element      = element
+        self.table        = table
+        self.n            = len(element)
+        self.index        = {}
+
+        # we color the table to indicate progress.  Colors are
+        # indices into self.palette, translated when the table is drawn
+        if not test_mode:
+            self.palette      = ["white","yellow","pink","orange",
+                                 "#e3592e","#d6a240","yellow","red"]
+
+            self.plain        = 0     # white: typical table entry
+        
+            self.H_color      = 1     # yellow: row index is an element of H
+        
+            self.S_color      = 2     # pink: column index is an element of S
+        
+            self.Q_color      = 3     # orange: row index in H, col index in S
+            # unprocessed queue item
+                                        
+            self.road_color   = 4     # row index in H, col index in S
+            # processed cell which produced
+            # a roadmap equation
+                                        
+            self.crossed      = 5     # row index in H, col index in S
+            # processed cell which did not
+            # produce roadmap equation
+
+            self.highlight    = 6     # yellow: rows, columns and entries
+                                      # under discussion
+            
+            self.bad_color    = 7     # red: entries showing a failure
+
+        # check that the table is the right shape
+        if not table.shape==(self.n,self.n):
+            raise ValueError(f"{self.n} elements given but table is not {self.n} by {self.n}")
+
+        # check that the list of elements consists of distinct entries
+        # making a dictionary in the process that maps from elements to
+        # indices
+        for a in element:
+            i=len(self.index)
+            if a in self.index:
+                raise ValueError(f"element {a} occurs twice")
+            self.index[a]=i
+
+        # store the group table in terms of indices of elements,
+        # using the narrowest dtype which can hold them
+        self.dtype         = index_dtype(self.n)
+        self.missing       = missing_index(self.dtype)
+        self.memory_budget = memory_budget
+        self.compact       = compact
+        self.workers       = workers # threads for checking triples
+                                     # in test mode
+        self.chunk_entries = chunk_entries # size of the 2-D gathers
+                                           # for roadmap batches
+        self.random_rounds = random_rounds # rounds of the random
+                                           # subsets test run before
+                                           # finding the roadmap, in
+                                           # test and minimal modes
+        self.seed          = seed
+        self.rng           = None # made when first needed, as it
+                                  # is slow to seed from the system
+        self.latin_square  = latin_square  # check for a latin square
+                                           # with closure, in test
+                                           # and minimal modes
+        if (element==list(range(self.n))) and (table.dtype.kind in 'iu'):
+            self.op = self.compact_table()
+        else:
+            self.op = self.index_table()
+        # rows of the transpose are the columns of op.  The view op.T
+        # reads them with a stride of n entries; a C-contiguous copy
+        # costs another n^2 entries of memory but reads them in order.
+        # A memory mapped op always has its transpose in a scratch
+        # file (in scratch_dir), as every check reads opT by rows.
+        if transpose_copy is None:
+            transpose_copy = self.n >= default_transpose_threshold
+        if isinstance(self.op,np.memmap) and self.n > 0:
+            self.opT = transpose_file(self.op,memory_budget,scratch_dir)
+        elif transpose_copy:
+            self.opT = np.ascontiguousarray(self.op.T)
+        else:
+            self.opT = self.op.T
+        assert not (isinstance(self.opT,np.memmap) and not self.opT.flags.c_contiguous), \
+            "columns of a memory mapped table must not be read through a view"
+        self.tableT = self.table.T
+        
+        if not test_mode:
+            # initialize the table to have white background
+            self.cell_colors  = np.full((self.n,self.n),self.plain,dtype=np.uint8)
+            self.row_colors   = np.full(self.n,self.plain,dtype=np.uint8)
+            self.col_colors   = np.full(self.n,self.plain,dtype=np.uint8)
+            self.image_cells  = None # cell colors when status_image
+                                     # was last called
+                
+        # S has at most log_2(n) elements since |H| doubles every
+        # time we add to S, so there are at most n*log_2(n) queue items
+        k=max(1,self.n.bit_length())
+        self.roadmap = self.Equations(self.n,self.dtype) # equations x*y=z
+        
+        self.Queue    = self.PairQueue(self.n*k,self.dtype) # (x,s) pairs
+        
+        self.H        = self.Subset(self.n,self.dtype) # H_add puts all x,S
+                                                       # pairs on Queue
+                                               
+        self.S        = self.Subset(self.n,self.dtype,capacity=k)
+                                                 # S_add puts all H,s
+                                                 # pairs on Queue
+                                         
+        self.untried=list(range(self.n-1,-1,-1))
+        # pop this when we need to try adding to S
+        # we try the elements in order
+
+        # need variable names which don't
+        # conflict with group element names
+
+        self.a_name='a'
+        self.b_name='b'
+        self.c_name='c'
+        names=list("astuxAUbcdefghijklmnopqrvwBCDIJKLMNOPQR")
+        i=0
+        while (i<len(names)) and ((names[i] in element) or (chr(ord(names[i])+1) in element) or (chr(ord(names[i])+2) in element)):
+            i=i+1
+        if (i<len(names)):
+            self.a_name=names[i]
+            self.b_name=chr(ord(names[i])+1)
+            self.c_name=chr(ord(names[i])+2)
+            
+        self.pause_between_pages = False
+        self.suppress_output     = True
+        self.triples_shown       = 1000 # at most this many triples
+                                        # are written out in minimal
+                                        # output mode
+        self.number_of_triples   = 0
+        self.roadmap_step        = 0
+        self.introduced          = False
+        self.recording           = False # record() sets this to keep
+        self.events              = []    # the output here, see below
+        self.cancelled           = False # see cancel()
+        self.triples_checked     = 0     # in batches, for progress()
+        
+    ##################################################################
+    # End of __init__                                                #
+    ##################################################################
+
+    #----------------------------------------------------------------#
+    # Translate the table of elements into a table of indices of
+    # elements, of dtype self.dtype, with self.missing for entries
+    # that are not elements.
+    #
+    # We sort the elements once and look up the entries with
+    # searchsorted, a block of rows at a time so that the temporary
+    # arrays stay within self.memory_budget.  Elements which numpy
+    # can't sort or compare with the table entries fall back to the
+    # dictionary self.index.
+
+    def index_table(self):
+        n=self.n
+        table=self.table
+        op=np.empty((n,n),dtype=self.dtype)
+        try:
+            labels=np.array(self.element)
+            if (labels.tolist()!=list(self.element)) or (table.dtype.kind=='O'):
+                raise TypeError("labels changed by conversion to an array")
+            order=np.argsort(labels,kind='stable').astype(self.dtype)
+            sorted_labels=labels[order]
+            for i,j in self.row_blocks(16):
+                block=table[i:j]
+                pos=np.searchsorted(sorted_labels,block)
+                pos[pos==n]=n-1
+                found=(sorted_labels[pos]==block)
+                if not (isinstance(found,np.ndarray) and found.shape==block.shape):
+                    raise TypeError("labels not comparable with table entries")
+                op[i:j]=np.where(found,order[pos],self.missing)
+            return op
+        except (TypeError,ValueError):
+            pass
+
+        for i in range(n):
+            for j in range(n):
+                x=self.table[i][j]
+                if x in self.index:
+                    k=self.index[x]
+                else:
+                    k=self.missing # if the set is not closed
+                                   # there will be missing's in the table
+                op[i][j] = k
+        return op
+
+    #----------------------------------------------------------------#
+    # A table whose elements are list(range(n)) is already a table of
+    # indices.  We keep it as it is if its dtype is no wider than
+    # self.dtype (or if self.compact is False, e.g. for a memory mapped
+    # table too big to copy), otherwise we copy it into self.dtype, a
+    # block of rows at a time, replacing out of range entries by
+    # self.missing.
+
+    def compact_table(self):
+        n=self.n
+        table=self.table
+        if (not self.compact) or (table.dtype.itemsize <= np.dtype(self.dtype).itemsize):
+            return table
+        op=np.empty((n,n),dtype=self.dtype)
+        for i,j in self.row_blocks(2*table.dtype.itemsize):
+            block=table[i:j]
+            op[i:j]=np.where((block<0)|(block>=n),self.missing,block)
+        return op
+
+    #----------------------------------------------------------------#
+    # Ranges of rows i:j such that temporary arrays using
+    # bytes_per_entry bytes per table entry fit in self.memory_budget
+
+    def row_blocks(self,bytes_per_entry):
+        n=self.n
+        rows=max(1,self.memory_budget//max(1,bytes_per_entry*n))
+        for i in range(0,n,rows):
+            yield i,min(i+rows,n)
+
+    ##################################################################
+    # Output hooks, overridden by the streamlit app                  #
+    ##################################################################
+
+    #----------------------------------------------------------------#  
+    # Display some (markdown) text
+    def write(self,text):
+        if self.recording:
+            self.events.append(('write',text))
+
+    #----------------------------------------------------------------#  
+    # Wait for reader before going on to the next page
+    def pause(self):
+        if self.recording:
+            self.events.append(('pause',))
+
+    #----------------------------------------------------------------#  
+    # Print our current status
+    def print_status(self):
+        if self.recording:
+            self.events.append(('status',self.status_change()))
+
+    #----------------------------------------------------------------#  
+    # Choose output options; without a UI we keep the defaults
+    def intro(self):
+        self.introduced=True
+
+    ##################################################################
+    # Progress, for running the checks in a background thread       #
+    ##################################################################
+
+    #----------------------------------------------------------------#
+    # Ask the checks to stop: test_table raises Cancelled at the next
+    # roadmap step or batch of triples
+    def cancel(self):
+        self.cancelled=True
+
+    def check_cancelled(self):
+        if self.cancelled:
+            raise Cancelled()
+
+    #----------------------------------------------------------------#
+    # The current phase of the checks and roughly how far through it
+    # we are, as a fraction.  While finding the roadmap that is |H|/n.
+    # For a group, the batches of triples hold (n-k-1)^2+(n-1)k^2
+    # triples with k=|S|; triples_checked counts the triples in the
+    # batches checked so far (with several workers, approximately).
+    def progress(self):
+        n=self.n
+        if not hasattr(self,"inverse"):
+            return "closure, identity and inverses",0.0
+        if not hasattr(self,"found_roadmap"):
+            return "finding a generating set",len(self.H)/n
+        k=len(self.S)
+        expected=(n-k-1)*(n-k-1)+(n-1)*k*k
+        return "checking triples",min(1.0,self.triples_checked/max(1,expected))
+
+    ##################################################################
+    # Recording the output                                           #
+    #                                                                #
+    # record() runs test_table once, keeping the output in            #
+    # self.events rather than showing it: ('write',text),            #
+    # ('status',status) for print_status and ('pause',) between      #
+    # pages.  A UI can then show the pages one at a time from the    #
+    # log instead of resuming the checks after every click.          #
+    ##################################################################
+    def record(self):
+        self.events       = []
+        self.first_cells  = self.cell_colors.reshape(-1).copy()
+        self.logged_cells = self.first_cells.copy()
+        self.replayed     = None
+        self.recording    = True
+        try:
+            # not self.test_table(), which a UI may override to
+            # replay the log
+            results=group_table_checker.test_table(self)
+        finally:
+            self.recording=False
+
+        # page k is events pages[k][0]..pages[k][1]-1
+        self.pages=[]
+        start=0
+        for i,event in enumerate(self.events):
+            if event[0]=='pause':
+                self.pages.append((start,i))
+                start=i+1
+        if start < len(self.events):
+            self.pages.append((start,len(self.events)))
+        return results
+
+    #----------------------------------------------------------------#
+    # What print_status shows: the table colors, the properties
+    # checked so far and how far H, S and the roadmap have got
+    def status(self):
+        return {'cells':    self.cell_colors,
+                'rows':     self.row_colors,
+                'cols':     self.col_colors,
+                'closed':   hasattr(self,"closed"),
+                'identity': getattr(self,"identity",None),
+                'inverses': hasattr(self,"inverse"),
+                'H':        len(self.H),
+                'S':        len(self.S),
+                'roadmap':  len(self.roadmap)}
+
+    #----------------------------------------------------------------#
+    # status() for the log, with the cell colors given as the flat
+    # positions and new colors of the cells changed since the last
+    # status event
+    def status_change(self):
+        status=self.status()
+        cells=self.cell_colors.reshape(-1)
+        changed=np.flatnonzero(cells!=self.logged_cells)
+        self.logged_cells[changed]=cells[changed]
+        status['cells']=(changed,cells[changed])
+        status['rows']=self.row_colors.copy()
+        status['cols']=self.col_colors.copy()
+        return status
+
+    #----------------------------------------------------------------#
+    # The status recorded as event i, with its cell colors put back
+    # together.  Going forward through the log only the changes since
+    # the last call are applied.
+    def replay_status(self,i):
+        if (self.replayed is None) or (self.replayed > i):
+            self.replay_cells=self.first_cells.copy()
+            self.replayed=-1
+        for event in self.events[self.replayed+1:i+1]:
+            if event[0]=='status':
+                changed,colors=event[1]['cells']
+                self.replay_cells[changed]=colors
+        self.replayed=i
+        status=dict(self.events[i][1])
+        status['cells']=self.replay_cells.reshape(self.n,self.n)
+        return status
+
+    #----------------------------------------------------------------#
+    # The colors of the table as an RGB image for print_status: a
+    # pixel per cell, below a row of pixels for the column labels and
+    # to the right of a column for the row labels.
+    #
+    # Tables with more than size rows are shrunk to size x size
+    # pixels, each showing the highest color index in its block of
+    # cells.  The pixels are kept between calls, and only those in
+    # rows and columns which have changed since the last call are
+    # worked out again.
+
+    def status_image(self,size=1024,status=None):
+        if status is None:
+            status=self.status()
+        n      = self.n
+        size   = min(n,size)
+        starts = (np.arange(size+1)*n)//size # pixel r shows cells
+                                             # starts[r]..starts[r+1]-1
+        cells  = status['cells']
+        if (self.image_cells is None) or (self.image_pixels.shape[0] != size):
+            self.image_cells  = cells.copy()
+            self.image_pixels = np.maximum.reduceat(
+                np.maximum.reduceat(cells,starts[:-1],axis=0),starts[:-1],axis=1)
+        else:
+            # columns changed in most rows are redone as columns, and
+            # the rows with changes elsewhere as rows
+            changed = cells!=self.image_cells
+            cols    = np.flatnonzero(np.count_nonzero(changed,axis=0) > n//2)
+            changed[:,cols] = False
+            rows    = np.flatnonzero(changed.any(axis=1))
+            self.image_cells[:,cols] = cells[:,cols]
+            self.image_cells[rows]   = cells[rows]
+            for c in np.unique(np.searchsorted(starts,cols,side='right')-1):
+                block = cells[:,starts[c]:starts[c+1]].max(axis=1)
+                self.image_pixels[:,c] = np.maximum.reduceat(block,starts[:-1])
+            for r in np.unique(np.searchsorted(starts,rows,side='right')-1):
+                block = cells[starts[r]:starts[r+1]].max(axis=0)
+                self.image_pixels[r] = np.maximum.reduceat(block,starts[:-1])
+
+        image = np.full((size+1,size+1),self.plain,dtype=np.uint8)
+        image[0,1:]  = np.maximum.reduceat(status['cols'],starts[:-1])
+        image[1:,0]  = np.maximum.reduceat(status['rows'],starts[:-1])
+        image[1:,1:] = self.image_pixels
+        return palette_rgb(self.palette)[image]
+
+    ##################################################################
+    # Subroutines                                                    #
+    ##################################################################
+
+    
+    #----------------------------------------------------------------#  
+    # For all elements a and b, is the a,b entry
+    # in the table always an element?
+    
+    def test_closure(self):
+        if not self.suppress_output:
+            self.print_status()
+            self.write("""
+            # Closure
+            
+            Testing whether the set is closed under the operation.
+            This means making sure that every entry in the table
+            is actually an element of the set.
+            
+            """)
+        # with latin_square, the rows are checked on the same pass,
+        # sorting a block at a time
+        latin=self.latin_square and self.suppress_output
+        self.repeated_entry=None
+        for i0,i1 in self.row_blocks(self.op.itemsize+1 if latin else 0):
+            block=self.op[i0:i1]
+            if (block.max() >= self.n) or (block.min() < 0):
+                I,J=np.where(np.logical_or((block>=self.n),(block<0)))
+                i=i0+I[0]
+                j=J[0]
+                a=self.element[i]
+                b=self.element[j]
+                c=self.table[i][j]
+                self.failed_product = [a,b,c]
+                if not self.test_mode:
+                    self.write(f"The element :red[${c}={a}*{b}$] is not in the set,")
+                    self.write("so this is not a group table.")
+                return False
+            if latin and (self.repeated_entry is None):
+                self.repeated_entry=self.first_repeat(block,i0)
+        self.closed=True
+        if not self.suppress_output:
+            self.write("It checks out! The set is closed under the operation")
+        return True
+    
+    #----------------------------------------------------------------#
+    # The first repeated entry in a row of block (rows i0.. of a table
+    # with entries 0..n-1), as [a,b,c] with a*b=a*c and b<c, or None
+    # if every row is a permutation.
+    def first_repeat(self,block,i0):
+        ordered=np.sort(block,axis=1)
+        bad=np.flatnonzero((ordered[:,1:]==ordered[:,:-1]).any(axis=1))
+        if len(bad)==0:
+            return None
+        row=block[bad[0]]
+        values,first=np.unique(row,return_index=True)
+        repeat=np.ones(self.n,dtype=bool)
+        repeat[first]=False
+        c=np.flatnonzero(repeat)[0]
+        b=first[np.searchsorted(values,row[c])]
+        return [i0+int(bad[0]),int(b),int(c)]
+
+    #----------------------------------------------------------------#
+    # With latin_square, after closure: is every row and column of the
+    # table a permutation?  A group table is a latin square, and
+    # checking is cheap, so most random tables are rejected before the
+    # identity, inverses and roadmap.  The rows were checked by
+    # test_closure; the columns are the rows of opT.
+    def test_latin_square(self):
+        failed=self.repeated_entry
+        kind='row'
+        if failed is None:
+            kind='column'
+            for i0,i1 in self.row_blocks(self.op.itemsize+1):
+                failed=self.first_repeat(self.opT[i0:i1],i0)
+                if failed is not None:
+                    # c*a = c*b in column c, written as a*c = b*c
+                    c,a,b=failed
+                    failed=[a,b,c]
+                    break
+        if failed is None:
+            return True
+        a,b,c=failed
+        self.failed_triple=[self.element[a],self.element[b],self.element[c]]
+        self.failed_triple_type=kind
+        if not self.test_mode:
+            e=self.element
+            if kind=='row':
+                product=f"{e[a]}*{e[b]}={e[a]}*{e[c]}={e[self.op[a,b]]}"
+            else:
+                product=f"{e[a]}*{e[c]}={e[b]}*{e[c]}={e[self.op[a,c]]}"
+            self.write(f":red[${product}$], so the table is not a latin square,")
+            self.write("and this is not a group table.")
+        return False
+
+    #----------------------------------------------------------------#    
+    # is there a two-sided identity?
+    # note that if there is, then there
+    # cannot be a separate one-sided identity
+
+    def test_identity(self):
+        text="""
+        # Identity
+        
+        Testing whether there is an identity element.
+
+        The row indexed by the identity element should look
+        exactly like the list of elements.
+        
+        """
+        # first find identity row of table.  We work with indices
+        # (closure has been checked), so the identity row of op is
+        # 0,1,...,n-1.  An identity i has i*e_0=e_0, so only rows with
+        # op[i,0]==0 need comparing; typically there is just one.
+        indices = np.arange(self.n,dtype=self.dtype)
+        i = self.n
+        if self.n > 0:
+            for candidate in np.flatnonzero(self.opT[0]==0):
+                if (self.op[candidate]==indices).all():
+                    i = int(candidate)
+                    break
+
+        if(i == self.n):
+            if not self.suppress_output:
+                self.print_status()
+                self.write(text)
+                self.write(":red[There is no such row, so there is no identity].")
+                self.write("This is not a group table.")
+            else:
+                if not self.test_mode:
+                    self.write(":red[There is no identity].")
+            return False
+
+        # we have a left identity
+        identity = i
+        if not self.suppress_output:
+            self.row_colors[i]=self.highlight
+            self.col_colors[i]=self.highlight
+            self.cell_colors[i]=self.highlight
+            self.cell_colors[:,i]=np.where(self.op[i]==self.opT[i],
+                                           self.highlight,self.bad_color)
+                    
+            self.print_status()
+
+            self.row_colors[i]=self.plain
+            self.col_colors[i]=self.plain
+            self.cell_colors[i]=self.plain
+            self.cell_colors[:,i]=self.plain
+
+            self.write(text)
+        
+            self.write(f"""
+            We found a row that looks right!
+            ${self.element[identity]}$ is a left identity.
+
+            We have highlighted the ${self.element[identity]}$ row and
+            the ${self.element[identity]}$ column.  Now we check
+            whether it's also a right identity.
+            """)
+        
+
+        # check if it's also a right identity
+        if not (self.opT[identity] == indices).all():
+            J=np.where(self.opT[identity]!=indices)
+            j=J[0][0]
+            a=self.element[j]
+            b=self.table[j,identity]
+            if not self.suppress_output:                
+                self.write(f"It is not! We have :red[${a}*{self.element[identity]}={b}$].")
+                self.write("This is not a group table.")
+            else:
+                if not self.test_mode:
+                    self.write(":red[There is no identity].")                
+            return False
+            
+        if not self.suppress_output:                
+            self.write("""
+            It is!
+            
+            """)
+        self.identity = identity
+
+        return True
+
+    #----------------------------------------------------------------#    
+    # Are there inverses ?
+
+    def test_inverses(self):
+        inverse = {}
+        identity=self.identity
+        a_name=self.a_name
+        b_name=self.b_name
+        c_name=self.c_name
+        
+        if not self.suppress_output:                
+            is_identity=(self.op==identity)
+            self.cell_colors[is_identity]=self.highlight
+                        
+            self.print_status()
+
+            # make table plain again
+            self.cell_colors[is_identity]=self.plain
+
+        
+            self.write(f"""
+            # Inverses
+            
+            Testing whether all elements have two-sided inverses.
+            
+            For every element ${a_name}$, we seek an element ${b_name}$ such
+            that ${a_name}*{b_name}={b_name}*{a_name}={self.element[identity]}$.
+            
+            To make it easier to check, we have highlighted
+            the identity element ${self.element[identity]}$
+            wherever it occurs in the table.  For there to
+            be inverses, we must have a highlighted entry in every
+            row and column, located symmetrically about the diagonal.
+            (Technically there must be a *subset* of the
+            highlighted entries with this property.)
+            """)
+            
+        # first[i] is the least j with i*j=j*i=identity, if there is
+        # one.  We read the same block of rows of op and of opT, and
+        # look up j*i in the opT block for each j with i*j=identity,
+        # so that a memory mapped table is read once, in order.
+        has_inverse=np.zeros(self.n,dtype=bool)
+        first=np.zeros(self.n,dtype=np.intp)
+        for i,j in self.row_blocks(2):
+            I,J=np.nonzero(self.op[i:j]==identity)
+            both=(gather(self.opT[i:j],I,J)==identity)
+            I=I+i
+            I,J=I[both],J[both]
+            rows,at=np.unique(I,return_index=True)
+            has_inverse[rows]=True
+            first[rows]=J[at]
+
+        if not has_inverse.all():
+            a=self.element[int(np.argmin(has_inverse))]
+            self.failed_inverse=a
+            if not self.test_mode:
+                self.write(f"""
+                    :red[The element ${a}$ has no inverse].
+                    This is not a group table.
+                    
+                    """)
+            return False
+
+        first=first.tolist()
+        for i in range(self.n):
+            if not i in inverse:
+                j=first[i]
+                inverse[i]=j
+                inverse[j]=i
+        inverse_array=np.empty(self.n,dtype=self.dtype)
+        inverse_array[list(inverse.keys())]=list(inverse.values())
+            
+        if not self.suppress_output:
+            self.write("All elements have inverses!")
+        self.inverse=inverse
+        self.inverse_array=inverse_array
+        return True
+
+
+    #----------------------------------------------------------------#
+    # check whether a triple satisfies associativity
+    #
+    # the optional arguments ab and bc are for
+    # cases in which many triples with either the same
+    # first two elements or same last two elements are to be tested.
+    # in such cases we require only three table lookups per triple
+    # instead of four
+    
+    def check_triple(self,a,b,c,ab=False,bc=False):
+        self.number_of_triples=self.number_of_triples+1
+        op=self.op
+        if ab==False:
+            ab   = op[a][b]
+        if bc==False:
+            bc   = op[b][c]
+        a_bc = op[a][bc]
+        ab_c = op[ab][c]
+
+        if a_bc == ab_c:
+            if not self.test_mode:
+                self.write(f"{self.number_of_triples}. {self.triple_text(a,b,c)}")
+            return True
+        else:
+            self.failed_triple=[self.element[a],self.element[b],self.element[c]]
+            if not self.test_mode:
+                self.write(f"{self.number_of_triples}. {self.triple_text(a,b,c)}")
+                self.write("This is not a group table")
+            return False
+
+    #----------------------------------------------------------------#
+    # the line of output for the triple (a,b,c): green with a check
+    # mark if it associates, red otherwise
+    def triple_text(self,a,b,c):
+        op   = self.op
+        e    = self.element
+        ab   = op[a][b]
+        bc   = op[b][c]
+        a_bc = op[a][bc]
+        ab_c = op[ab][c]
+        if a_bc == ab_c:
+            allgood=r"${\ \ \ \ "+f"({e[a]}*{e[b]})*{e[c]}={e[ab]}*{e[c]}={e[ab_c]}={e[a]}*{e[bc]}={e[a]}*({e[b]}*{e[c]})"+r"\ \ \ \ \checkmark"+r"}$"
+            return f":green[{allgood}]"
+        violation=r"${\ \ \ \ "+f"({e[a]}*{e[b]})*{e[c]}={e[ab]}*{e[c]}={e[ab_c]}"+r"\neq "+f"{e[a_bc]}={e[a]}*{e[bc]}={e[a]}*({e[b]}*{e[c]})"+r"}$"
+        return f":red[{violation}]"
+
+    #----------------------------------------------------------------#
+    # before adding an element s to S, we check that the entries
+    # in the s column with rows indexed by elements of H are distinct
+    # from each other and not in H
+    #
+    # if this fails we can quickly find a triple violating associativity
+    #
+    # if this always holds, then we must have that |H| doubles with
+    # every addition to S, so |S| never exceeds log_2(n)
+    
+    def enforce_growth(self,s):
+        H=self.H
+        S=self.S
+        op=self.op
+        a=self.a_name
+        b=self.b_name
+        c=self.c_name
+        roadmap=self.roadmap
+        identity=self.identity
+        inverse=self.inverse
+
+        # look at the whole s column at once: if the H entries are
+        # distinct and not in H we are done.  Otherwise we go through
+        # H one element at a time to explain the failure.
+        H_array=H.array()
+        in_H=H.member
+        Hs=self.opT[s][H_array]
+        if (not in_H[Hs].any()) and (np.bincount(Hs,minlength=self.n).max() <= 1):
+            return True
+
+        Growth = {}
+        for x in H:
+            y = op[x][s]
+            
+            if y in Growth:
+                z = Growth[y] # z * s = x * s = y
+                if not self.suppress_output:
+                    self.write(f"""
+                    We have a duplicate in the ${self.element[s]}$ column: ${self.element[z]}*{self.element[s]}={self.element[x]}*{self.element[s]}={self.element[y]}$.
+                    At most two triples to check before we find a violation:
+                    """)
+                # one of the two triples fails, so s never joins S
+                self.failed_triple_type='right inverse'
+                if self.check_triple(z,s,inverse[s]):
+                    self.check_triple(x,s,inverse[s])
+                return False
+
+            Growth[y] = x
+            if y in H:
+                # we have x * s in H
+                if not self.suppress_output:
+                    self.write(f"""
+                    We have ${self.element[x]}*{self.element[s]}={self.element[y]}$, which is an element of $H$.
+                    A few triples to check before we find a violation:
+                    """)
+                xinv = inverse[x]
+                if not self.check_triple(xinv,x,s):
+                    self.failed_triple_type='left inverse'
+                    return False
+
+                # we have s = xinv * y
+                if xinv in H:
+                    self.failed_triple_type='x inverse roadmap'
+                    if not self.suppress_output:
+                        self.write(f"""
+                        We have ${self.element[xinv]}*{self.element[y]}={self.element[s]}$, where both ${self.element[xinv]}$ and
+                        ${self.element[y]}$ are in $H$.  We will take the first
+                        roadmap equation ${a}*{b}={c}$ such that ${self.element[xinv]}*{c}$
+                        is not an element of $H$ (this exists because ${c}={self.element[y]}$
+                        works), and we will see that the
+                        triple $({self.element[xinv]},{a},{b})$ fails.
+                        """)
+                    
+                    for i in range(0,len(roadmap)):
+                        z_i = roadmap[i]['z']
+                        if not op[xinv][z_i] in H:
+                            x_i = roadmap[i]['x']
+                            y_i = roadmap[i]['y']
+                            
+                            if not self.suppress_output:
+                                self.write(f"""
+				Found roadmap equation ${self.element[x_i]}*{self.element[y_i]}={self.element[z_i]}$
+                                with ${self.element[xinv]}*{self.element[z_i]}$ not in $H$.
+                                """)
+                            
+                            self.check_triple(xinv,x_i,y_i)
+                            return False
+                        # should never reach this line
+                    assert False, "unreachable (?) line"
+
+                    
+                else: #xinv not in H
+                    if not self.suppress_output:
+                        self.write(f"""
+                        We have ${self.element[x]}*{self.element[xinv]}={self.element[identity]}$, where ${self.element[x]}$ is
+                        in $H$ but ${self.element[xinv]}$ is not.
+                        We will look for a roadmap equation
+                        ${a}*{b}={c}$ such that ${self.element[x]}*{c}$
+                        is not an element of $H$. 
+
+                        There may not be such an equation, but if
+                        there is, then the triple ${self.element[x]},{a},{b}$
+                        must fail.
+                        """)
+                    
+                    for i in range(0,len(roadmap)):
+                        z_i = roadmap[i]['z']
+                        if not op[x][z_i] in H:
+                            x_i = roadmap[i]['x']
+                            y_i = roadmap[i]['y']
+                            
+                            self.failed_triple_type='x roadmap'
+                            if not self.suppress_output:
+                                self.write(f"""Found roadmap equation
+                                ${self.element[x_i]}*{self.element[y_i]}={self.element[z_i]}$ with ${self.element[x]}*{self.element[z_i]}$
+                                not in $H$.""")
+
+                            self.check_triple(x,x_i,y_i)
+                            return False
+
+                    if not self.suppress_output:
+                        self.write(f"""
+                        There is no such equation, so
+                        the ${self.element[x]}$ row of the table
+                        must have a repeated entry (since the ${self.element[xinv]}$
+                        column as well as all the $H$ columns
+                        contain elements of $H$).
+                        """)
+                    # x * maps H to H
+                    self.failed_triple_type='xH'                        
+                    xH = {identity:xinv}
+                    for v in H:
+                        xv = op[x][v]
+                        if xv in xH:
+                            u = xH[xv]
+                            if not self.suppress_output:
+                                self.write(f"""
+                                We have ${self.element[x]}*{self.element[u]}={self.element[x]}*{self.element[v]}$ so one of the
+                                two triples $({self.element[xinv]},{self.element[x]},{self.element[u]})$ and
+                                $({self.element[xinv]},{self.element[x]},{self.element[v]}$ must fail.
+                                """)
+                            if self.check_triple(xinv,x,u):
+                                self.check_triple(xinv,x,v)
+                            return False
+                        else:
+                            xH[xv] = v
+                        
+                    # should never reach this line
+                    assert False, "unreachable (??) line"
+        return True
+    
+    #----------------------------------------------------------------#
+    # Process every (x,s) pair on the queue at once, breadth first.
+    #
+    # Popping the pairs one at a time, each z=x*s not yet in H is added
+    # to H with the roadmap equation x*s=z, and the pairs (z,S) go on
+    # the end of the queue.  Here we gather all the products with one
+    # fancy index and keep the first occurrence of each new z, in queue
+    # order, which gives exactly the same H, roadmap and queue.  A
+    # memory mapped op is read in the order it is stored.
+
+    def expand_frontier(self):
+        H=self.H
+        S=self.S.array()
+        xs,ss=self.Queue.pop_all()
+        if isinstance(self.op,np.memmap):
+            zs=gather_in_order(self.op,xs,ss)
+        else:
+            zs=self.op[xs,ss]
+
+        new=np.flatnonzero(~H.member[zs])
+        if len(new)==0:
+            return
+        z_new,first=np.unique(zs[new],return_index=True)
+        new=new[np.sort(first)]
+        x,y,z=xs[new],ss[new],zs[new]
+
+        H.add_many(z)
+        self.roadmap.add_many(x,y,z)
+        self.Queue.push(np.repeat(z,len(S)),np.tile(S,len(z)))
+
+        if not self.test_mode:
+            self.cell_colors[x,y]=self.road_color
+
+    #----------------------------------------------------------------#
+    # We need to undo the table coloration sometimes
+    def plain_table(self):
+        self.row_colors[:]=self.plain
+        self.col_colors[:]=self.plain
+        self.cell_colors[:]=self.plain
+
+    ##################################################################
+    # End of subroutines                                             #
+    ##################################################################
+    
+
+    ##################################################################
+    # Main routines                                                  #
+    ##################################################################
+
+    #----------------------------------------------------------------#
+    # Find a generating set and roadmap
+
+    def find_roadmap(self):
+        
+        identity= self.identity
+        op      = self.op
+        n       = self.n
+        Queue   = self.Queue
+        H       = self.H
+        untried = self.untried
+
+
+        # start with H = {identity}
+        if len(H)==0:
+            H.add(identity)
+            
+            if not self.suppress_output:            
+                i=identity
+                self.row_colors[i]=self.H_color
+                self.cell_colors[i]=self.H_color
+
+                a=self.a_name
+                b=self.b_name
+                c=self.c_name
+                self.write(f"""
+                # Associativity
+                ## Finding a generating set
+                
+                Before testing the table for associativity,
+                we will compute a *generating set* $S$, that is,
+                a set such that we can express every element (other
+                than the identity) as a product of elements of $S$.
+                
+                As we compute $S$, we will keep track of the set $H$
+                of elements we know how to express as products of
+                elements of $S$.  We start with $H={self.element[identity]}$,
+                since ${self.element[identity]}$ is the empty product.
+                And any time we
+                add an element to $S$, we may add it to $H$ as well.
+                
+                This process will be indicated by coloring the table as
+                follows: rows indexed by elements of $H$ will be
+                highlighted in yellow. Columns indexed by
+                elements of $S$ will be highlighted in pink. Where
+                these rows and column intersect, the table will initially
+                by highlighted in orange.
+                
+                We process each orange position at most once.
+                Let $({a},{b})$ be the indices of an orange position,
+                so ${a}$ is in $H$ and ${b}$ is an element of $S$.
+                We examine the element ${c}={a}* {b}$ in that
+                orange position.
+                
+                
+                  - Case 1: ${c}$ is not in $H$.
+
+                     * Add ${c}$ to $H$, highlighting the ${c}$ row
+                       yellow.
+
+                     * Change the $({a},{b})$ position from orange to red.
+
+                     * Record the equation ${c}={a}* {b}$ on our
+                       *road map*.
+
+                  - Case 2: Change the $({a},{b})$ position to grey-orange.
+
+                Think of $H$ as being *known territory*.  The road map
+                records how to get to each newly reached element of
+                $H$ from previously reached elements.
+
+                When there are no orange positions, if there are any elements
+                ${a}$ not in $H$, we will pick one and try to add it to $S$.
+                Before adding ${a}$ to $S$, however, we check that the
+                yellow entries in the ${a}$ column are distinct from each
+                other and not in $H$.  If this condition fails, we will
+                quickly be able to find a triple violating associativity.
+                On the other hand, if this condition always holds, then
+                the set $S$ will be small.  For a set of size ${self.n}$,
+                we will have $|S|$ at most ${math.floor(math.log2(self.n))}$.
+        
+                Once every element has been added to $H$, we will be ready to
+                start testing triples.
+
+                """)
+                self.pause()
+
+                  
+        while len(H) < n:
+            self.check_cancelled()
+
+            if not self.suppress_output:                           
+                self.print_status()
+                self.roadmap_step=self.roadmap_step+1
+                self.write(f"""
+                ## Finding a generating set, step {self.roadmap_step}
+                """)
+
+            
+            # close H under right multiplication by S
+            if (Queue.size() > 0) and self.suppress_output:
+                # nothing to explain, so process the queue a whole
+                # level at a time
+                self.expand_frontier()
+
+            elif Queue.size() > 0:
+                x,y=self.Queue_pop()
+                z = op[x][y]
+
+                if not self.suppress_output:            
+                
+                    self.write(f"""
+                    Processing orange entry in position $({self.element[x]},{self.element[y]})$.
+                    
+                    We find ${self.element[x]}*{self.element[y]}={self.element[z]}$...
+                    
+                    """)
+                
+                if not z in H:
+                    self.H_add(z) # appends S,z pairs to Queue
+                    self.roadmap_add(x,y,z) #equation x * y = z
+                    if not self.suppress_output:            
+                        self.write(f"""
+                        ... and ${self.element[z]}$ is not in $H$.  So we add ${self.element[z]}$ to $H$ and
+                        add ${self.element[x]}*{self.element[y]}={self.element[z]}$ to our list of roadmap equations.
+                        
+                        """)
+                        self.pause()
+                    
+                else:
+                    if not self.suppress_output:            
+                    
+                        self.write(f"""
+                        ... and ${self.element[z]}$ is already in $H$, so we do nothing here.
+                        
+                        """)
+                        
+                        self.pause()
+
+            else:
+                if not self.suppress_output:            
+
+                    self.write("""
+                    There are no plain orange positions. This means that
+                    $H$ is closed under right multiplication by elements of $S$.
+                    In order to make progress, we must find some element not
+                    in $H$ and add it to $S$.
+
+                    """)
+                
+                
+                # find some s in G \ H
+                s=untried.pop()
+                while s in H:
+                    s=untried.pop()
+
+                if not self.suppress_output:            
+                    
+                    self.write(f"""
+                    Trying the element ${self.element[s]}$.
+                    
+                    We have to check that the yellow entries in the
+                    ${self.element[s]}$ column are distinct from each other and
+                    not already in $H$.  If that fails, then we can quickly
+                    find a triple violating associativity.
+                    
+                    """)
+
+                # enforce growth condition
+                if not self.enforce_growth(s):
+                    return False
+
+                if not self.suppress_output:                            
+                    self.write(f"""
+                    The element ${self.element[s]}$ checks out! adding it to both $H$ and $S$.
+                    
+                    """)
+                
+                # add s to both S and H
+                self.S_add(s) # appends H,s pairs to Queue
+                self.H_add(s) # appends s,S pairs to Queue
+                
+                if not self.suppress_output:            
+                    self.pause()
+                 
+        self.found_roadmap=True
+        if not self.suppress_output:                    
+            self.print_status()
+            self.write(f"""
+            We now have $|H|={n}$, so $S$ is a generating set.
+            """)
+            self.plain_table()
+            self.pause()
+        return True
+    
+    #----------------------------------------------------------------#
+    # The random subsets test (see random_error_bound), as a quick way
+    # to reject tables before finding the roadmap.  Subsets are index
+    # arrays; the product UV is the set of elements which occur an odd
+    # number of times as u*v, found with bincount a block of U at a
+    # time.
+
+    def subset_product(self,U,V):
+        counts=np.zeros(self.n,dtype=np.intp)
+        rows=max(1,self.memory_budget//(8*(self.n+len(V))))
+        for i in range(0,len(U),rows):
+            products=np.take(self.op[U[i:i+rows]],V,axis=1)
+            counts+=np.bincount(products.ravel(),minlength=self.n)
+        return np.flatnonzero(counts&1)
+
+    def associates(self,A,B,C):
+        AB_C=self.subset_product(self.subset_product(A,B),C)
+        A_BC=self.subset_product(A,self.subset_product(B,C))
+        return (len(AB_C)==len(A_BC)) and (AB_C==A_BC).all()
+
+    # Run the rounds, returning False if one fails, with failed_triple
+    # set to a triple in A x B x C which fails.  (AB)C+A(BC) is linear
+    # in each of A, B and C, so if it is nonzero it is nonzero for one
+    # half of A, and so on down to single elements.
+    def random_subsets_test(self,rounds=None):
+        if rounds is None:
+            rounds=self.random_rounds
+        n=self.n
+        if self.rng is None:
+            self.rng=np.random.RandomState(self.seed)
+        for r in range(rounds):
+            self.check_cancelled()
+            subsets=[np.flatnonzero(self.rng.randint(low=0,high=2,size=n))
+                     for i in range(3)]
+            if self.associates(*subsets):
+                continue
+            for i in range(3):
+                while len(subsets[i]) > 1:
+                    half=len(subsets[i])//2
+                    first_half=subsets[:i]+[subsets[i][:half]]+subsets[i+1:]
+                    if self.associates(*first_half):
+                        subsets[i]=subsets[i][half:]
+                    else:
+                        subsets[i]=subsets[i][:half]
+            a,b,c=(int(X[0]) for X in subsets)
+            self.failed_triple_type='random subsets'
+            self.check_triple(a,b,c)
+            return False
+        return True
+
+    #----------------------------------------------------------------#
+    # Test mode: the batches of triples checked by test_triples are
+    # numbered 0,1,2,...  First come the |S|^2 batches (s,g,t) with
+    # s,t in S, then two batches for each roadmap equation x_i*y_i=z_i:
+    # (x_i,y_i,z_j) for j >= i ('roadmap left'), and (z_j,x_i,y_i) for
+    # j > i ('roadmap right').
+
+    def prepare_batches(self):
+        n=self.n
+        # index arrays in the dtype of op, so gathers stay compact
+        nonidentity      = np.arange(n,dtype=self.dtype)
+        self.nonidentity = nonidentity[np.where(nonidentity!=self.identity)]
+        self.S_array     = self.S.array()
+        self.roadmap_eqs = self.roadmap.array()
+        self.roadmap_z   = np.ascontiguousarray(self.roadmap_eqs['z'])
+        self.number_of_batches = len(self.S)**2+2*len(self.roadmap)
+
+    #----------------------------------------------------------------#
+    # number of triples in batches 0..batch-1
+    def triples_before(self,batch):
+        S_size=len(self.S_array)
+        L=len(self.roadmap_z)
+        triples=min(batch,S_size*S_size)*(self.n-1)
+        if batch > S_size*S_size:
+            p,parity=divmod(batch-S_size*S_size,2)
+            triples=triples+2*L*p-p*p+parity*(L-p)
+        return triples
+
+    #----------------------------------------------------------------#
+    # Check one (s,g,t) batch with a few gathers, returning None if
+    # every triple passes, otherwise the first failing triple (as
+    # indices) and its type.
+    def S_batch_failure(self,batch):
+        op     = self.op
+        opT    = self.opT
+        S      = self.S_array
+        i,j = divmod(batch,len(S))
+        s   = S[i]
+        t   = S[j]
+        g   = self.nonidentity
+        sg  = op[s][g]
+        gt  = opT[t][g]
+        sg_t= opT[t][sg]
+        s_gt= op[s][gt]
+        if not (sg_t==s_gt).all():
+            g_bad=g[np.where(sg_t!=s_gt)][0]
+            return [s,g_bad,t],'S'
+        return None
+
+    #----------------------------------------------------------------#
+    # Check both batches of the roadmap equations i0..i1-1 together,
+    # as 2-D gathers: row r is equation i=i0+r, column c is z_j for
+    # j=i0+c, masked to j>=i (left) or j>i (right).  Returns None if
+    # every triple in batches start..stop-1 passes, otherwise the first
+    # failing batch number, failing triple and type.
+    def roadmap_chunk_failure(self,i0,i1,start,stop):
+        first = len(self.S_array)**2+2*i0
+        eqs   = self.roadmap_eqs[i0:i1]
+        x     = eqs['x'].astype(np.intp)[:,None]
+        y     = eqs['y'].astype(np.intp)[:,None]
+        z     = eqs['z'].astype(np.intp)[:,None]
+        z_j   = self.roadmap_z[i0:].astype(np.intp)[None,:]
+        rows  = np.arange(i1-i0)[:,None]
+        cols  = np.arange(z_j.shape[1])[None,:]
+
+        op    = self.op
+        opT   = self.opT
+        left  = (gather(op,z,z_j)!=gather(op,x,gather(op,y,z_j))) & (cols>=rows)
+        right = (gather(opT,z,z_j)!=gather(opT,y,gather(opT,x,z_j))) & (cols>rows)
+
+        bad   = np.stack([left.any(axis=1),right.any(axis=1)],axis=1).ravel()
+        batch = first+np.arange(len(bad))
+        bad   = np.flatnonzero(bad & (batch>=start) & (batch<stop))
+        if len(bad)==0:
+            return None
+        r,parity=divmod(int(bad[0]),2)
+        if parity==0:
+            c=np.flatnonzero(left[r])[0]
+            return first+2*r,[x[r,0],y[r,0],z_j[0,c]],'roadmap left'
+        c=np.flatnonzero(right[r])[0]
+        return first+2*r+1,[z_j[0,c],x[r,0],y[r,0]],'roadmap right'
+
+    #----------------------------------------------------------------#
+    # Check batches start..stop-1 in order, returning None if every
+    # triple passes, otherwise the first failing batch number, failing
+    # triple and type.  We give up (returning None) once we get past
+    # batch number give_up(), if given.
+    #
+    # Roadmap batches are checked self.chunk_entries table entries at
+    # a time, which bounds the size of the temporary arrays.
+    def first_failure(self,start,stop,give_up=None):
+        S_batches=len(self.S_array)**2
+        for batch in range(start,min(stop,S_batches)):
+            if (give_up is not None) and (batch > give_up()):
+                return None
+            self.check_cancelled()
+            failure=self.S_batch_failure(batch)
+            self.triples_checked=self.triples_checked+len(self.nonidentity)
+            if failure is not None:
+                return (batch,)+failure
+
+        L=len(self.roadmap_z)
+        i =(max(start,S_batches)-S_batches)//2
+        end=min(L,(stop-S_batches+1)//2)
+        while i < end:
+            if (give_up is not None) and (S_batches+2*i > give_up()):
+                return None
+            i1=min(end,i+max(1,self.chunk_entries//(L-i)))
+            self.check_cancelled()
+            failure=self.roadmap_chunk_failure(i,i1,start,stop)
+            self.triples_checked=(self.triples_checked
+                                  +self.triples_before(S_batches+2*i1)
+                                  -self.triples_before(S_batches+2*i))
+            if failure is not None:
+                return failure
+            i=i1
+        return None
+
+    #----------------------------------------------------------------#
+    # Check all the remaining batches, recording the failing triple if
+    # there is one.  With self.workers > 1, runs of consecutive
+    # batches go to a thread pool (numpy releases the GIL for the
+    # gathers).  A run stops at its first failing batch, and runs give
+    # up past the first failure found so far.  Every batch before the
+    # earliest failure is still checked, so the failure reported, and
+    # number_of_triples, are the same as when checking in order.
+
+    def test_triples_batched(self):
+        start=self.batch_count
+        number_of_batches=self.number_of_batches
+
+        if self.workers > 1:
+            run=max(1,(number_of_batches-start)//(8*self.workers))
+            failures=[]
+            earliest=[number_of_batches]
+            lock=threading.Lock()
+
+            def check_run(first):
+                failure=self.first_failure(first,min(first+run,number_of_batches),
+                                           give_up=lambda: earliest[0])
+                if failure is not None:
+                    with lock:
+                        failures.append(failure)
+                        earliest[0]=min(earliest[0],failure[0])
+
+            with concurrent.futures.ThreadPoolExecutor(max_workers=self.workers) as pool:
+                list(pool.map(check_run,range(start,number_of_batches,run)))
+            failure=min(failures,default=None)
+        else:
+            failure=self.first_failure(start,number_of_batches)
+
+        if failure is None:
+            self.batch_count=number_of_batches
+        else:
+            self.batch_count=failure[0]+1
+        self.number_of_triples=(self.number_of_triples
+                                +self.triples_before(self.batch_count)
+                                -self.triples_before(start))
+        if failure is None:
+            return True
+        batch,triple,self.failed_triple_type=failure
+        self.failed_triple=[self.element[i] for i in triple]
+        if not self.test_mode:
+            # count triples up to the failing one, as check_triple does
+            self.number_of_triples=(self.number_of_triples
+                                    -self.triples_before(batch+1)
+                                    +self.triples_before(batch)
+                                    +self.triple_position(batch,triple))
+        return False
+
+    #----------------------------------------------------------------#
+    # The triples of a batch, as index arrays a,b,c, in the order
+    # test_triples checks them one at a time
+    def batch_triples(self,batch):
+        S_batches=len(self.S_array)**2
+        if batch < S_batches:
+            i,j = divmod(batch,len(self.S_array))
+            g   = self.nonidentity
+            return (np.full(len(g),self.S_array[i]),g,
+                    np.full(len(g),self.S_array[j]))
+        p,parity = divmod(batch-S_batches,2)
+        x,y,z    = self.roadmap_eqs[p].tolist()
+        if parity==0:
+            z_j = self.roadmap_z[p:]
+            return np.full(len(z_j),x),np.full(len(z_j),y),z_j
+        z_j = self.roadmap_z[p+1:]
+        return z_j,np.full(len(z_j),x),np.full(len(z_j),y)
+
+    #----------------------------------------------------------------#
+    # 1 + the position of triple in its batch
+    def triple_position(self,batch,triple):
+        a,b,c=self.batch_triples(batch)
+        return int(np.flatnonzero((a==triple[0])&(b==triple[1])&(c==triple[2]))[0])+1
+
+    #----------------------------------------------------------------#
+    # Minimal output: after test_triples_batched has checked batches
+    # start..batch_count-1, write out what checking them one triple at
+    # a time would have.  The batch numbers and number_of_triples
+    # determine every line, so we only format the first
+    # self.triples_shown triples (and a failing triple), skipping the
+    # rest.
+    def write_triples(self,start,number,passed):
+        first=number
+        shown=0
+        for batch in range(start,self.batch_count):
+            a,b,c=self.batch_triples(batch)
+            if passed or (batch < self.batch_count-1):
+                count=len(a)
+            else:
+                count=self.number_of_triples-number
+            if shown < self.triples_shown:
+                self.write("----")
+                lines=min(count,self.triples_shown-shown)
+                for k in range(lines):
+                    self.write(f"{number+k+1}. {self.triple_text(a[k],b[k],c[k])}")
+                shown=shown+lines
+            number=number+count
+
+        skipped=number-first-shown
+        if passed:
+            if skipped > 0:
+                self.write(f"... and {skipped} more triples.")
+            if self.number_of_batches==0:
+                self.write("This is a group table")
+            elif len(self.roadmap_z)==0:
+                self.write(f"""
+                    ----
+                
+                    All {self.number_of_triples} required triples check out!!! This is a group table.
+                    """)
+            else:
+                self.write(f"All {self.number_of_triples} required triples check out!!! This is a group table.")
+        else:
+            if skipped > 0:
+                if skipped > 1:
+                    self.write(f"... and {skipped-1} more triples.")
+                a,b,c=self.batch_triples(self.batch_count-1)
+                k=count-1
+                self.write(f"{number}. {self.triple_text(a[k],b[k],c[k])}")
+            self.write("This is not a group table")
+
+    def test_triples(self):
+
+        n       = self.n
+        identity= self.identity
+        S       = self.S
+        S_size  = len(S)
+        roadmap = self.roadmap
+        a       = self.a_name
+        b       = self.b_name
+        c       = self.c_name
+
+        # the triples come in batches
+
+ 
+        if not hasattr(self,'batch_count'):
+            self.batch_count=0
+            if not self.suppress_output:                        
+                self.write(f"""
+                # Associativity
+                ## Checking triples
+                """)
+                self.write(f"""
+                Now that we have our generating set {self.S_string}
+                together with {self.roadmap_string}
+                
+                """)
+                self.write(f"""
+                We are ready to start checking triples of elements
+                $({a},{b},{c})$, testing whether
+                $$
+                ({a}*{b})*{c}={a}*({b}*{c}).
+                $$
+                If ever that fails, we are done: we can safely conclude
+                that the table is not a group table.
+                
+                On the other hand, suppose every triple we check passes its
+                test? At what point can we conclude that associativity holds
+                for *all* triples? Must we actually test all ${n}^3={n*n*n}$
+                triples?
+                
+                We will see that if we are careful, we need only test
+                ${(n-S_size-1)*(n-S_size-1)+(n-1)*S_size*S_size}$ triples.  We will organize
+                the triples into *batches*, each of which has a purpose
+                which we will state as we go.
+                
+                Each batch will have two of the elements ${a},{b},{c}$
+                fixed while the other varies.  We never need to check
+                a triple that includes ${self.element[identity]}$ since those would
+                pass automatically.  So the maximum batch size is ${n-1}$.
+                
+                   - A batch for which ${a}$ and ${c}$ are fixed will 
+                     establish that the operation of
+                     left-multiplying an element by ${a}$ *commutes*
+                     with the operation of right-multiplying an element
+                     by ${c}$. That is, applying those two operations,
+                     in either order, to all elements ${b}$ yields the
+                     same result (assuming all triples 
+                     pass their tests).
+
+                   - A batch for which ${a}$ and ${b}$ are fixed will
+                     establish that the operation of left-multiplying
+                     an element
+                     by $({a}*{b})$ is the composition of the operation
+                     of left-multiplying by ${a}$ with the operation
+                     of left-multiplying by ${b}$ (assuming all triples
+                     pass their tests).
+          
+
+                   - A batch for which ${b}$ and ${c}$ are fixed will
+                     establish that the operation of right-multiplying
+                     an element
+                     by $({b}*{c})$ is the composition of the operation
+                     of right-multiplying by ${c}$ with the operation
+                     of right-multiplying by ${b}$ (assuming all triples
+                     pass their tests).
+
+                By organizing the triples into batches in this manner,
+                we will be able to keep track of our knowledge, and
+                eventually conclude with certainty that the table defines
+                a group (assuming all triples pass their tests).
+
+                We will maintain a set $X$, such that we have established
+                that for any triple $({a},{b},{c})$ with both ${a},{c}$
+                in $X$, $({a}*{b})*{c}={a}*({b}*{c})$.
+                That is, for all ${a},{c}$ in $X$, left-multiplication
+                by ${a}$ commutes with right-multiplication by ${c}$.
+
+                As $X$ gets larger, the batches will get smaller,
+                since we can omit from the batch any triples
+                which start and end with elements of $X$.
+                
+                Once everything is in $X$,
+                we will know that associativity holds.
+                """)
+                self.X_string=r"$X=\{"+f"{self.element[identity]}"+r"\}$"
+                self.pause()
+            elif not self.test_mode:
+                self.write("Generating set "+self.S_string)
+                self.write("R"+self.roadmap_string[1:])
+                
+        if self.suppress_output:
+            # no explanations, so no need to go one batch at a time.
+            # In minimal output mode the triples are written afterwards.
+            self.prepare_batches()
+            start=self.batch_count
+            number=self.number_of_triples
+            passed=self.test_triples_batched()
+            if not self.test_mode:
+                self.write_triples(start,number,passed)
+            return passed
+
+        while self.batch_count < S_size*S_size:
+            i = self.batch_count // S_size
+            j = self.batch_count - S_size*i
+            self.batch_count=self.batch_count+1
+
+            s=S[i]
+            t=S[j]
+
+            if self.suppress_output:
+                if not self.test_mode:                
+                    self.write("----")
+            else:
+                # s row
+                self.row_colors[s]=self.highlight
+                self.cell_colors[s]=self.highlight
+                
+                # t column
+                self.col_colors[t]=self.highlight
+                self.cell_colors[:,t]=self.highlight
+                    
+                self.print_status()
+
+                # then make it plain colors again
+                # s row
+                self.row_colors[s]=self.plain
+                self.cell_colors[s]=self.plain
+                
+                # t column
+                self.col_colors[t]=self.plain
+                self.cell_colors[:,t]=self.plain
+                
+                self.write(f"## Checking triples, batch {self.batch_count}")
+                self.write(f"{self.X_string}")
+                self.write(f"""
+                For any ${a},{b}$ in $X$,
+                left multiplication by ${a}$
+                commutes with right multiplication by ${b}$.
+                
+                Checking whether left multiplication by ${self.element[s]}$ commutes
+                with right multiplication by ${self.element[t]}$: 
+                """)
+                
+            # check all s,g,t triples for g != identity
+            for g in range(self.n):
+                if not g == identity:
+                    if not self.check_triple(s,g,t):
+                        self.failed_triple_type='S'
+                        return False
+                
+            if (s==t) and (not self.suppress_output):
+                self.X_string=self.X_string[:-3]+f",{self.element[s]}"+r"\}$"
+
+            if (self.batch_count == S_size*S_size) and (len(roadmap)==0):
+                if not self.test_mode:
+                    self.write(f"""
+                    ----
+                
+                    All {self.number_of_triples} required triples check out!!! This is a group table.
+                    """)
+                return True
+            else:    
+                if not self.suppress_output:
+                    self.pause()
+
+        roadmap_length=len(roadmap)
+        
+        while self.batch_count < S_size*S_size+2*roadmap_length:
+            # now we check triples based on the road map
+            # two batches per equation
+            roadmap_index    =  self.batch_count - S_size*S_size
+            parity           =  roadmap_index%2
+            roadmap_index    =  (roadmap_index-parity)//2
+
+            self.batch_count = self.batch_count + 1
+            
+            equation=roadmap[roadmap_index]
+            x = equation['x']
+            y = equation['y']
+            z = equation['z']
+                
+            if self.suppress_output:
+                if not self.test_mode:
+                    self.write("----")
+            else:
+                if parity==0:
+                    # batch is x * y * g triples
+                    # so highlight x,y,z rows
+                    self.row_colors[[x,y,z]]=self.highlight
+                    self.cell_colors[[x,y,z]]=self.highlight
+                        
+                    self.print_status()
+                
+                    # make table plain again
+                    self.row_colors[[x,y,z]]=self.plain
+                    self.cell_colors[[x,y,z]]=self.plain
+                            
+                            
+                else: 
+                    # batch is g * x * y triples
+                    # so highlight x,y,z columns                    
+                    self.col_colors[[x,y,z]]=self.highlight
+                    self.cell_colors[:,[x,y,z]]=self.highlight
+                            
+                    self.print_status()
+                
+                    # make table plain again
+                    self.col_colors[[x,y,z]]=self.plain
+                    self.cell_colors[:,[x,y,z]]=self.plain
+                        
+                self.write(f"## Checking triples, batch {self.batch_count}")
+                self.write(f"{self.X_string}")
+                self.write(f"""
+                For any ${a},{b}$ in $X$,
+                left multiplication by ${a}$
+                commutes with right multiplication by ${b}$.
+                """)
+            
+            if parity==0:
+                if not self.suppress_output:                
+                    self.write(f"""
+                    Working with Roadmap equation
+                    ${self.element[x]}*{self.element[y]}={self.element[z]}$:
+                    
+                    Checking whether left multiplication by
+                    ${self.element[z]}$ is the composition of left
+                    multiplication by ${self.element[x]}$ and left
+                    multiplication by ${self.element[y]}$. If this
+                    checks out, we will have established left
+                    multiplication by ${self.element[z]}$ commutes
+                    with right multiplication by elements of $X$.
+                    
+                    We have that ${self.element[x]}$ is in $X$. We
+                    must check all triples
+                    $({self.element[x]},{self.element[y]},{c})$ with
+                    ${c}$ not in $X$, since for ${c}$ in $X$ we know
+                    that left multiplication by ${self.element[x]}$
+                    commutes with right multiplication by ${c}$.
+                    """)
+
+                for j in range(roadmap_index,roadmap_length):
+                    z_j = roadmap[j]['z']
+                    if not self.check_triple(x,y,z_j,ab=z):
+                        self.failed_triple_type='roadmap left'
+                        return False
+                            
+
+                if not self.suppress_output:                    
+                    self.pause()
+                
+            else:
+                if not self.suppress_output:        
+                    self.write(f"""
+                    Working with Roadmap equation ${self.element[x]}*{self.element[y]}={self.element[z]}$:
+                    
+                    Checking whether right multiplication by ${self.element[z]}$ is
+                    the composition of right multiplication by ${self.element[y]}$ and
+                    right multiplication by ${self.element[x]}$. If this checks out,
+                    we will have established right multiplication by ${self.element[z]}$
+                    commutes with left multiplication by elements
+                    of $X$ and also with left multiplication by ${self.element[z]}$.
+                    Thus, we will be able to add ${self.element[z]}$ to $X$
+                    
+                    We have that ${self.element[y]}$ is in $X$. We only check
+                    triples $({a},{self.element[x]},{self.element[y]})$ with ${a}$ not in $X$,
+                    since for ${a}$ in $X$ we know that left multiplication
+                    by ${a}$ commutes with right multiplication by ${self.element[y]}$.
+                    
+                    But we just established (in the previous batch) that
+                    left multiplication by ${self.element[z]}$ commutes with right
+                    multiplication by ${self.element[y]}$: we don't need to check
+                    ${a}={self.element[z]}$.
+                    
+                    """)
+                    
+                if roadmap_index+1 < roadmap_length:
+                    for j in range(roadmap_index+1,roadmap_length):
+                        z_j = roadmap[j]['z']
+                        if not self.check_triple(z_j,x,y,bc=z):
+                            self.failed_triple_type='roadmap right'
+                            return False
+                            
+                    if not self.suppress_output:                    
+                        self.X_string=self.X_string[:-3]+f",{self.element[z]}"+r"\}$"
+                        self.pause()
+
+                else:
+                    if not self.suppress_output:                    
+                        self.write(f"""
+                        There are no triples to check!!!
+                        We may add ${self.element[z]}$ to $X$!
+
+                        Every element is now in $X$!!!
+                        """)
+                        
+                    if not self.test_mode:
+                        self.write(f"All {self.number_of_triples} required triples check out!!! This is a group table.")
+                    return True
+
+                
+        
+        # should only get here with a 1 x 1 table
+        if not self.test_mode:
+            self.write("This is a group table")
+        return True
+        
+    def test_table(self):
+
+        timings={}
+        if not (self.introduced or self.test_mode):
+            self.intro()
+
+
+        if not hasattr(self,"closed"):
+            start_time=time.process_time()                        
+            closed=self.test_closure()
+            timings['closure']=time.process_time()-start_time
+            if not closed:
+                return {'is_group':False,
+                        'failed_property':'closure',
+                        'failed_product':self.failed_product,
+                        'timings':timings
+                        }
+            if self.latin_square and self.suppress_output:
+                start_time=time.process_time()
+                latin=self.test_latin_square()
+                timings['latin square']=time.process_time()-start_time
+                if not latin:
+                    return {'is_group':False,
+                            'failed_property':'latin square',
+                            'failed_triple':self.failed_triple,
+                            'failed_triple_type':self.failed_triple_type,
+                            'timings':timings
+                            }
+            if not self.suppress_output:
+                self.pause()
+
+        if not hasattr(self,"identity"):
+            start_time=time.process_time()                        
+            has_identity=self.test_identity()
+            timings['identity']=time.process_time()-start_time
+            if not has_identity:
+                return {'is_group':False,
+                        'failed_property':'identity',
+                        'timings':timings
+                        }
+            if not self.suppress_output:
+                self.pause()
+
+        if not hasattr(self,"inverse"):
+            start_time=time.process_time()                        
+            has_inverses=self.test_inverses()
+            timings['inverse']=time.process_time()-start_time
+            if not has_inverses:
+                return {'is_group':False,
+                        'failed_property':'inverses',
+                        'failed_inverse':self.failed_inverse,
+                        'timings':timings
+                        }
+            if not self.suppress_output:
+                self.pause()
+
+        
+        if self.suppress_output and (self.random_rounds > 0) and (len(self.H)==0):
+            start_time=time.process_time()
+            passed=self.random_subsets_test()
+            timings['random']=time.process_time()-start_time
+            if not passed:
+                return {'is_group':False,
+                        'failed_property':'associativity',
+                        'failed_triple':self.failed_triple,
+                        'failed_triple_type':self.failed_triple_type,
+                        'number_of_triples':self.number_of_triples,
+                        'timings':timings
+                        }
+
+        if (len(self.H) < self.n) or (not hasattr(self,"found_roadmap")):
+            start_time=time.process_time()                        
+            found=self.find_roadmap()
+            timings['roadmap']=time.process_time()-start_time
+            if not found:
+                return {'is_group':False,
+                        'failed_property':'associativity',
+                        'failed_triple':self.failed_triple,
+                        'failed_triple_type':self.failed_triple_type,
+                        'number_of_triples':self.number_of_triples,
+                        'timings':timings
+                        }
+            if not self.suppress_output:
+                self.pause()
+
+        start_time=time.process_time()
+        passed=self.test_triples()
+        timings['triples']=time.process_time()-start_time
+        if not passed:
+            return {'is_group':False,
+                    'failed_property':'associativity',
+                    'failed_triple':self.failed_triple,
+                    'failed_triple_type':self.failed_triple_type,
+                    'number_of_triples':self.number_of_triples,
+                    'timings':timings
+                    }
+        else:
+            self.is_group=True
+            return self.group_results(timings)
+
+    def group_results(self,timings):
+        return {'is_group':True,
+                'number_of_triples':self.number_of_triples,
+                'generators':list(self.S),
+                'identity':self.identity,
+                'inverse':self.inverse,
+                'inverse_array':self.inverse_array,
+                'roadmap':self.roadmap.as_dicts(),
+                'timings':timings
+                }
+
+    ##################################################################
+    # Checking again after editing a few entries                     #
+    ##################################################################
+
+    #----------------------------------------------------------------#
+    # Test mode: set a*b=c for each (a,b,c) in edits (as elements),
+    # in the checker's own copy of the table (see own_table), and
+    # return the results of test_table for the edited table.  After a check which found a
+    # group only what the edited entries can change is checked again,
+    # which for k edited entries costs about k*|S|*n table lookups
+    # rather than n^2:
+    #
+    # * closure (and, with latin_square, the rows and columns) for
+    #   the edited entries, rows and columns;
+    # * the identity, if its row or column was edited, and the
+    #   inverses of the elements whose row or column was edited;
+    # * the roadmap: if the product x*y of one of its equations was
+    #   edited, it no longer holds and we check from scratch;
+    # * the triples: batch (s,g,t) reads only the s row and t column,
+    #   roadmap left batch i only the x_i, y_i and z_i rows, and
+    #   roadmap right batch i only the x_i, y_i and z_i columns.  We
+    #   check those batches again, except that when only the y_i row
+    #   (or column) was edited we check just the triples which read an
+    #   edited entry, since y_i is in S and so is y_i for about n/|S|
+    #   equations.
+    #
+    # The verdict is that of a fresh check.  A failing triple is the
+    # first in batch order for the old S and roadmap, which may not be
+    # the one a fresh check finds.  results['rechecked_triples'] is
+    # the number of triples checked.
+    def edit_table(self,edits):
+        if not self.test_mode:
+            raise ValueError("edit_table is only for test mode")
+        self.own_table()
+        start_time=time.process_time()
+        n=self.n
+        changed={} # (i,j): (old index, new index)
+        for a,b,c in edits:
+            for x in (a,b):
+                if not x in self.index:
+                    raise ValueError(f"{x} is not an element")
+            i=self.index[a]
+            j=self.index[b]
+            old=changed[(i,j)][0] if (i,j) in changed else int(self.op[i,j])
+            self.table[i,j]=c
+            if self.op is not self.table:
+                self.op[i,j]=self.index.get(c,self.missing)
+            new=int(self.op[i,j])
+            self.opT[j,i]=new
+            changed[(i,j)]=(old,new)
+
+        if not getattr(self,"is_group",False):
+            return self.check_again()
+        cells=[(i,j,old,new) for (i,j),(old,new) in sorted(changed.items()) if old!=new]
+        if len(cells)==0:
+            results=self.group_results({'edit':time.process_time()-start_time})
+            results['rechecked_triples']=0
+            return results
+        rows=sorted(set(i for i,j,old,new in cells))
+        cols=sorted(set(j for i,j,old,new in cells))
+
+        # closure
+        for i,j,old,new in cells:
+            if not (0 <= new < n):
+                self.failed_product=[self.element[i],self.element[j],self.table[i][j]]
+                return self.edit_failure({'is_group':False,
+                                          'failed_property':'closure',
+                                          'failed_product':self.failed_product
+                                          },start_time)
+
+        if self.latin_square:
+            failed=None
+            for i in rows:
+                failed=self.first_repeat(self.op[i:i+1],i)
+                if failed is not None:
+                    self.failed_triple_type='row'
+                    break
+            if failed is None:
+                for j in cols:
+                    failed=self.first_repeat(self.opT[j:j+1],j)
+                    if failed is not None:
+                        c,a,b=failed
+                        failed=[a,b,c]
+                        self.failed_triple_type='column'
+                        break
+            if failed is not None:
+                self.failed_triple=[self.element[x] for x in failed]
+                return self.edit_failure({'is_group':False,
+                                          'failed_property':'latin square',
+                                          'failed_triple':self.failed_triple,
+                                          'failed_triple_type':self.failed_triple_type
+                                          },start_time)
+
+        # identity
+        identity=self.identity
+        if (identity in rows) or (identity in cols):
+            if not self.test_identity():
+                return self.edit_failure({'is_group':False,
+                                          'failed_property':'identity'
+                                          },start_time)
+            if not self.identity==identity:
+                return self.check_again()
+
+        # inverses: only an element whose row or column was edited can
+        # lose its inverse, or gain another
+        touched=np.array(sorted(set(rows)|set(cols)),dtype=np.intp)
+        both=(self.op[touched]==identity)&(self.opT[touched]==identity)
+        has_inverse=both.any(axis=1)
+        if not has_inverse.all():
+            self.failed_inverse=self.element[int(touched[np.argmin(has_inverse)])]
+            return self.edit_failure({'is_group':False,
+                                      'failed_property':'inverses',
+                                      'failed_inverse':self.failed_inverse
+                                      },start_time)
+        old_inverse=self.inverse_array.copy()
+        first=both.argmax(axis=1)
+        for a,b in zip(touched.tolist(),first.tolist()):
+            self.inverse[a]=b
+        self.inverse_array[touched]=first
+
+        # the roadmap
+        if not hasattr(self,"roadmap_eqs"):
+            self.prepare_batches()
+        eqs=self.roadmap_eqs
+        x=eqs['x'].astype(np.intp)
+        y=eqs['y'].astype(np.intp)
+        z=eqs['z'].astype(np.intp)
+        position=np.full(n,-1,dtype=np.intp) # of z in the roadmap
+        position[z]=np.arange(len(z))
+        for i,j,old,new in cells:
+            p=position[old]
+            if (p >= 0) and (x[p]==i) and (y[p]==j):
+                return self.check_again()
+
+        # the triples
+        roadmap_triples=self.number_of_triples-self.triples_before(self.number_of_batches)
+        S=self.S_array.astype(np.intp)
+        S_batches=len(S)*len(S)
+        in_rows=np.zeros(n,dtype=bool)
+        in_rows[rows]=True
+        in_cols=np.zeros(n,dtype=bool)
+        in_cols[cols]=True
+        rechecked=0
+        failures=[] # (batch,triple,type), at most one per batch
+
+        S_rows=np.flatnonzero(in_rows[S])
+        S_cols=np.flatnonzero(in_cols[S])
+        batches=set((S_rows[:,None]*len(S)+np.arange(len(S))[None,:]).ravel().tolist())
+        batches|=set((np.arange(len(S))[:,None]*len(S)+S_cols[None,:]).ravel().tolist())
+        for batch in sorted(batches):
+            failure=self.S_batch_failure(batch)
+            rechecked=rechecked+len(self.nonidentity)
+            if failure is not None:
+                failures.append((batch,)+failure)
+                break
+
+        if len(failures)==0:
+            whole_left =in_rows[x]|in_rows[z]
+            whole_right=in_cols[x]|in_cols[z]
+            for i in np.flatnonzero(whole_left|whole_right).tolist():
+                for batch,whole in [(S_batches+2*i,whole_left[i]),
+                                    (S_batches+2*i+1,whole_right[i])]:
+                    if whole:
+                        failure=self.roadmap_chunk_failure(i,i+1,batch,batch+1)
+                        rechecked=rechecked+self.triples_before(batch+1)-self.triples_before(batch)
+                        if failure is not None:
+                            failures.append(failure)
+
+            # single triples (x_i,y_i,z_j), j>=i, reading an edited y_i
+            # row entry y_i*z_j, and (z_j,x_i,y_i), j>i, reading an
+            # edited y_i column entry (z_j*x_i)*y_i.  The x_i column
+            # was not edited, so z_j is the old product (z_j*x_i)*x_i^-1.
+            keys=np.array([i*n+j for i,j,old,new in cells],dtype=np.intp)
+            olds=np.array([old for i,j,old,new in cells],dtype=np.intp)
+            found=[]
+            part_left =in_rows[y] & ~whole_left
+            part_right=in_cols[y] & ~whole_right
+            for r,c,old,new in cells:
+                I=np.flatnonzero(part_left & (y==r))
+                I=I[I <= position[c]]
+                found.append((S_batches+2*I,np.full(len(I),position[c]),
+                               x[I],y[I],np.full(len(I),c)))
+
+                I=np.flatnonzero(part_right & (y==c))
+                u=self.old_entries(np.full(len(I),r),old_inverse[x[I]],keys,olds)
+                keep=position[u] > I
+                I=I[keep]
+                u=u[keep]
+                found.append((S_batches+2*I+1,position[u],u,x[I],y[I]))
+            batch,j,a,b,c=[np.concatenate(parts) for parts in zip(*found)]
+            rechecked=rechecked+len(batch)
+            op=self.op
+            bad=np.flatnonzero(gather(op,gather(op,a,b),c)!=gather(op,a,gather(op,b,c)))
+            if len(bad) > 0:
+                k=bad[np.lexsort((j[bad],batch[bad]))[0]]
+                failures.append((int(batch[k]),[a[k],b[k],c[k]],
+                                 'roadmap left' if (batch[k]-S_batches)%2==0 else 'roadmap right'))
+
+        timings={'edit':time.process_time()-start_time}
+        if len(failures)==0:
+            results=self.group_results(timings)
+            results['rechecked_triples']=rechecked
+            return results
+        batch,triple,self.failed_triple_type=min(failures,key=lambda failure: failure[0])
+        self.failed_triple=[self.element[i] for i in triple]
+        return self.edit_failure({'is_group':False,
+                                  'failed_property':'associativity',
+                                  'failed_triple':self.failed_triple,
+                                  'failed_triple_type':self.failed_triple_type,
+                                  'number_of_triples':roadmap_triples+self.triples_before(batch+1),
+                                  'rechecked_triples':rechecked
+                                  },start_time)
+
+    #----------------------------------------------------------------#
+    # The table passed in belongs to the caller, so the first edit
+    # copies it, and op too when op is the table itself (with opT when
+    # it is a view of op), leaving the caller's array as it was.  A
+    # memory mapped table is refused rather than copied, as the copy
+    # would be the whole table in memory: load it with np.load
+    # (without mmap_mode) to edit it.
+    def own_table(self):
+        if getattr(self,"owns_table",False):
+            return
+        if isinstance(self.table,np.memmap) or isinstance(self.op,np.memmap):
+            raise ValueError("edit_table can't edit a memory mapped table")
+        op_is_table=self.op is self.table
+        opT_is_view=self.opT.base is self.op
+        self.table=self.table.copy()
+        self.tableT=self.table.T
+        if op_is_table:
+            self.op=self.table
+        if opT_is_view:
+            self.opT=self.op.T
+        self.owns_table=True
+
+    #----------------------------------------------------------------#
+    # The entries a*b of the table before the edits, where keys (in
+    # increasing order) are a*n+b for the edited entries and olds
+    # their old values
+    def old_entries(self,a,b,keys,olds):
+        entries=gather(self.op,a,b).astype(np.intp)
+        key=a*self.n+b
+        k=np.minimum(np.searchsorted(keys,key),len(keys)-1)
+        edited=(keys[k]==key)
+        entries[edited]=olds[k[edited]]
+        return entries
+
+    #----------------------------------------------------------------#
+    # Forget the checks so far, so that test_table starts again
+    def reset_checks(self):
+        for name in ["closed","identity","inverse","inverse_array",
+                     "found_roadmap","batch_count","roadmap_eqs","is_group"]:
+            if hasattr(self,name):
+                delattr(self,name)
+        k=max(1,self.n.bit_length())
+        self.roadmap  = self.Equations(self.n,self.dtype)
+        self.Queue    = self.PairQueue(self.n*k,self.dtype)
+        self.H        = self.Subset(self.n,self.dtype)
+        self.S        = self.Subset(self.n,self.dtype,capacity=k)
+        self.untried  = list(range(self.n-1,-1,-1))
+        self.number_of_triples = 0
+        self.triples_checked   = 0
+
+    def check_again(self):
+        self.reset_checks()
+        results=self.test_table()
+        if 'number_of_triples' in results:
+            results['rechecked_triples']=results['number_of_triples']
+        return results
+
+    def edit_failure(self,results,start_time):
+        self.reset_checks()
+        results['timings']={'edit':time.process_time()-start_time}
+        return results
+            
+
+
+#####################################################################
+# stacks of small tables                                            #
+#####################################################################
+
+#--------------------------------------------------------------------#
+# Test mode for a (B,n,n) stack of integer tables, each with elements
+# 0..n-1, taking every table through the steps of test_table at once:
+# each step is a few whole-stack array operations rather than B runs
+# of group_table_checker, whose per-call overhead dominates for small
+# tables.  The results are those of test_table for each table:
+#
+#   results['is_group'][i]           : bool
+#   results['failed_property'][i]    : as in test_table, or None
+#   results['failed_triple'][i]      : [a,b,c], or None
+#   results['failed_triple_type'][i] : as in test_table, or None
+#
+# Finding the roadmap goes in lockstep: on each pass every table
+# still growing H either expands its queue by a level, as in
+# expand_frontier, or tries the least element not in H for S.  Only
+# explaining a failure of the growth condition is done one table at
+# a time, by growth_failure, which runs enforce_growth.
+
+class stacked_table_checker(object):
+    def __init__(self,tables):
+        tables=np.asarray(tables)
+        if not ((tables.ndim==3) and (tables.shape[1]==tables.shape[2])):
+            raise ValueError("tables must be a (B,n,n) array")
+        if not tables.dtype.kind in 'iu':
+            raise ValueError("tables must have integer entries 0..n-1")
+        self.tables = tables
+        self.B      = tables.shape[0]
+        self.n      = tables.shape[1]
+        self.active = np.ones(self.B,dtype=bool) # not yet failed
+        self.failed_property    = [None]*self.B
+        self.failed_triple      = [None]*self.B
+        self.failed_triple_type = [None]*self.B
+
+    # op[r,a,b] for index arrays r, a and b
+    def at(self,r,a,b):
+        n=self.n
+        return np.take(self.flat,(np.multiply(r,n,dtype=np.intp)+a)*n+b)
+
+    def fail(self,rows,failed_property,triples=None,triple_type=None):
+        self.active[rows]=False
+        for k,r in enumerate(np.asarray(rows).tolist()):
+            self.failed_property[r]=failed_property
+            if triples is not None:
+                self.failed_triple[r]=[int(x) for x in triples[k]]
+                self.failed_triple_type[r]=triple_type
+
+    #----------------------------------------------------------------#
+    def test_closure(self):
+        tables=self.tables
+        bad=((tables<0)|(tables>=self.n)).reshape(self.B,-1).any(axis=1)
+        self.fail(np.flatnonzero(bad),'closure')
+        # the failed tables are zeroed, so that later gathers stay in
+        # range (their results are ignored)
+        op=tables.astype(index_dtype(self.n))
+        op[bad]=0
+        self.op=op
+        self.flat=op.reshape(-1)
+
+    def test_identity(self):
+        indices=np.arange(self.n)
+        op=self.op
+        two_sided=(op==indices).all(axis=2)&(op.transpose(0,2,1)==indices).all(axis=2)
+        has_identity=two_sided.any(axis=1)
+        self.identity=two_sided.argmax(axis=1)
+        self.fail(np.flatnonzero(self.active & ~has_identity),'identity')
+
+    def test_inverses(self):
+        e=self.identity[:,None,None]
+        both=(self.op==e)&(self.op.transpose(0,2,1)==e)
+        has_inverses=both.any(axis=2).all(axis=1)
+        self.fail(np.flatnonzero(self.active & ~has_inverses),'inverses')
+
+    #----------------------------------------------------------------#
+    # H, S, the roadmap and the queue of every table, as arrays with
+    # one row per table and a size per table
+    def find_roadmap(self):
+        B=self.B
+        n=self.n
+        k=max(1,n.bit_length())
+        rows=np.arange(B)
+        self.member = np.zeros((B,n),dtype=bool)
+        self.H      = np.zeros((B,n),dtype=np.intp)
+        self.S      = np.zeros((B,k),dtype=np.intp)
+        self.R      = np.zeros((B,3,n),dtype=np.intp) # x,y,z rows
+        self.Qx     = np.zeros((B,n*k),dtype=np.intp)
+        self.Qs     = np.zeros((B,n*k),dtype=np.intp)
+        self.H_size = np.ones(B,dtype=np.intp)
+        self.S_size = np.zeros(B,dtype=np.intp)
+        self.R_size = np.zeros(B,dtype=np.intp)
+        self.Q_size = np.zeros(B,dtype=np.intp)
+        self.member[rows,self.identity]=True
+        self.H[:,0]=self.identity
+
+        growing=self.active & (self.H_size < n)
+        while growing.any():
+            expanding=growing & (self.Q_size > 0)
+            if expanding.any():
+                self.expand_frontier(np.flatnonzero(expanding))
+            trying=self.active & (self.H_size < n) & (self.Q_size==0)
+            if trying.any():
+                self.try_generators(np.flatnonzero(trying))
+            growing=self.active & (self.H_size < n)
+
+    # positions 0..sizes[i]-1 of rows[i], for all i, in order
+    def positions(self,rows,sizes):
+        r=np.repeat(rows,sizes)
+        j=np.arange(len(r))-np.repeat(np.cumsum(sizes)-sizes,sizes)
+        return r,j
+
+    #----------------------------------------------------------------#
+    # one level of the queue of each of the tables rows, as in
+    # group_table_checker.expand_frontier
+    def expand_frontier(self,rows):
+        n=self.n
+        width=self.Q_size[rows].max()
+        xs=self.Qx[rows,:width]
+        ss=self.Qs[rows,:width]
+        zs=self.at(rows[:,None],xs,ss)
+        new=(np.arange(width) < self.Q_size[rows,None]) & ~self.member[rows[:,None],zs]
+        i,j=np.nonzero(new)
+        # the first occurrence of each new z in its table's queue
+        first=np.unique(i*n+zs[i,j],return_index=True)[1]
+        first.sort()
+        i,j=i[first],j[first]
+        r=rows[i]
+        x,y,z=xs[i,j],ss[i,j],zs[i,j]
+        counts=np.bincount(i,minlength=len(rows))
+        rank=np.arange(len(i))-np.repeat(np.cumsum(counts)-counts,counts)
+
+        self.member[r,z]=True
+        self.H[r,self.H_size[r]+rank]=z
+        self.R[r,0,self.R_size[r]+rank]=x
+        self.R[r,1,self.R_size[r]+rank]=y
+        self.R[r,2,self.R_size[r]+rank]=z
+        self.H_size[rows]+=counts
+        self.R_size[rows]+=counts
+
+        # the new queue: (z,s) for each new z and each s in S
+        S_size=self.S_size[r]
+        q_r,t=self.positions(r,S_size)
+        q_z=np.repeat(z,S_size)
+        q_sizes=counts*self.S_size[rows]
+        q_j=np.arange(len(q_r))-np.repeat(np.cumsum(q_sizes)-q_sizes,q_sizes)
+        self.Qx[q_r,q_j]=q_z
+        self.Qs[q_r,q_j]=self.S[q_r,t]
+        self.Q_size[rows]=q_sizes
+
+    #----------------------------------------------------------------#
+    # Try the least element s not in H for each of the tables rows: if
+    # the H entries of the s column are distinct and not in H, add s
+    # to S and H, as S_add and H_add do.
+    def try_generators(self,rows):
+        n=self.n
+        s=self.member[rows].argmin(axis=1)
+        width=self.H_size[rows].max()
+        valid=np.arange(width) < self.H_size[rows,None]
+        Hs=self.at(rows[:,None],self.H[rows,:width],s[:,None])
+        in_H=(valid & self.member[rows[:,None],Hs]).any(axis=1)
+        Hs=np.sort(np.where(valid,Hs,n+np.arange(width)),axis=1)
+        repeated=(Hs[:,1:]==Hs[:,:-1]).any(axis=1)
+
+        grows=~(in_H | repeated)
+        for i in np.flatnonzero(~grows).tolist():
+            passed,triple,triple_type=self.growth_failure(rows[i],s[i])
+            if passed:
+                grows[i]=True
+            else:
+                self.fail([rows[i]],'associativity',[triple],triple_type)
+        rows,s=rows[grows],s[grows]
+
+        # the queue is (x,s) for x in H, then (s,t) for t in S
+        H_size=self.H_size[rows]
+        self.S[rows,self.S_size[rows]]=s
+        self.S_size[rows]+=1
+        r,j=self.positions(rows,H_size)
+        self.Qx[r,j]=self.H[r,j]
+        self.Qs[r,j]=np.repeat(s,H_size)
+        r,t=self.positions(rows,self.S_size[rows])
+        j=np.repeat(H_size,self.S_size[rows])+t
+        self.Qx[r,j]=np.repeat(s,self.S_size[rows])
+        self.Qs[r,j]=self.S[r,t]
+        self.Q_size[rows]=H_size+self.S_size[rows]
+        self.member[rows,s]=True
+        self.H[rows,H_size]=s
+        self.H_size[rows]+=1
+
+    #----------------------------------------------------------------#
+    # enforce_growth for table r and element s, once the fast test
+    # has failed, giving (passed, failed triple, failed triple type).
+    # This runs enforce_growth itself, on a checker for table r alone
+    # with the same identity, inverses, H and roadmap.
+    def growth_failure(self,r,s):
+        G=group_table_checker(list(range(self.n)),self.tables[r],test_mode=True)
+        G.test_identity()
+        G.test_inverses()
+        G.H.add_many(self.H[r,:self.H_size[r]])
+        x,y,z=self.R[r,:,:self.R_size[r]]
+        G.roadmap.add_many(x,y,z)
+        passed=G.enforce_growth(int(s))
+        return passed,getattr(G,'failed_triple',None),getattr(G,'failed_triple_type',None)
+
+    #----------------------------------------------------------------#
+    # The (s,g,t) batches and then the roadmap batches, as in
+    # test_triples_batched, for every table at once: the failure
+    # reported is the first in batch order.
+    def test_triples(self):
+        rows=np.flatnonzero(self.active)
+        if len(rows)==0:
+            return
+        n=self.n
+        r=rows[:,None,None,None]
+        S=self.S[rows]
+        valid=np.arange(S.shape[1]) < self.S_size[rows,None]
+        s=S[:,:,None,None]
+        t=S[:,None,:,None]
+        g=np.arange(n)[None,None,None,:]
+        bad=((self.at(r,self.at(r,s,g),t)!=self.at(r,s,self.at(r,g,t)))
+             & valid[:,:,None,None] & valid[:,None,:,None])
+        bad=bad.reshape(len(rows),-1)
+        failing=bad.any(axis=1)
+        i,j,g=np.unravel_index(bad[failing].argmax(axis=1),(S.shape[1],S.shape[1],n))
+        triples=np.stack([S[failing,i],g,S[failing,j]],axis=1)
+        self.fail(rows[failing],'associativity',triples,'S')
+
+        rows=rows[~failing]
+        if (len(rows)==0) or (self.R_size[rows].max()==0):
+            return
+        L=self.R_size[rows].max()
+        r=rows[:,None,None]
+        x,y,z=self.R[rows,:,:L].transpose(1,0,2)
+        x_i,y_i,z_i=x[:,:,None],y[:,:,None],z[:,:,None]
+        z_j=z[:,None,:]
+        valid=np.arange(L) < self.R_size[rows,None]
+        order=np.arange(L)
+        left =((self.at(r,z_i,z_j)!=self.at(r,x_i,self.at(r,y_i,z_j)))
+               & (order[None,:]>=order[:,None]))
+        right=((self.at(r,self.at(r,z_j,x_i),y_i)!=self.at(r,z_j,z_i))
+               & (order[None,:]>order[:,None]))
+        both=valid[:,:,None] & valid[:,None,:]
+        bad=np.stack([left & both,right & both],axis=2).reshape(len(rows),-1)
+        failing=bad.any(axis=1)
+        i,side,j=np.unravel_index(bad[failing].argmax(axis=1),(L,2,L))
+        f=np.flatnonzero(failing)
+        for side_type,on_side in (('roadmap left',side==0),('roadmap right',side==1)):
+            a,b,c=x[f,i],y[f,i],z[f,j]
+            if side_type=='roadmap left':
+                triples=np.stack([a,b,c],axis=1)
+            else:
+                triples=np.stack([c,a,b],axis=1)
+            self.fail(rows[f[on_side]],'associativity',triples[on_side],side_type)
+
+    #----------------------------------------------------------------#
+    def test_stack(self):
+        self.test_closure()
+        if self.n==0:
+            # an empty table has no identity, as test_table finds
+            self.fail(np.arange(self.B),'identity')
+        else:
+            self.test_identity()
+            self.test_inverses()
+            self.find_roadmap()
+            self.test_triples()
+        return {'is_group':           self.active.copy(),
+                'failed_property':    self.failed_property,
+                'failed_triple':      self.failed_triple,
+                'failed_triple_type': self.failed_triple_type
+                }
+
+#--------------------------------------------------------------------#
+# stacked_table_checker(tables).test_stack(), a chunk of tables at a
+# time so that the temporary arrays stay within memory_budget
+def check_stack(tables,memory_budget=default_memory_budget):
+    tables=np.asarray(tables)
+    B=tables.shape[0]
+    n=tables.shape[1] if tables.ndim==3 else 0
+    chunk=max(1,memory_budget//(64*max(1,n*n)))
+    results={'is_group':[],'failed_property':[],
+             'failed_triple':[],'failed_triple_type':[]}
+    for start in range(0,B,chunk):
+        part=stacked_table_checker(tables[start:start+chunk]).test_stack()
+        for key in results:
+            results[key].extend(list(part[key]))
+    results['is_group']=np.array(results['is_group'],dtype=bool)
+    return results
+
+
+#####################################################################
+# tables on disk                                                    #
+#####################################################################
+
+#--------------------------------------------------------------------#
+# Open a table stored as a .npy file, or as raw binary with the given
+# dtype (the file must then hold n*n entries for some n), without
+# reading it into memory.
+def map_table(path,dtype=None):
+    if str(path).endswith('.npy'):
+        table=np.load(path,mmap_mode='r')
+    else:
+        if dtype is None:
+            raise ValueError(f"dtype needed to read raw table {path}")
+        table=np.memmap(path,dtype=dtype,mode='r')
+        n=math.isqrt(len(table))
+        if not n*n==len(table):
+            raise ValueError(f"{path} holds {len(table)} entries, which is not a square")
+        table=table.reshape((n,n))
+    if not (table.ndim==2 and table.shape[0]==table.shape[1]):
+        raise ValueError(f"{path} does not hold a square table")
+    return table
+
+#--------------------------------------------------------------------#
+# Test a table stored on disk, working directly on the memory mapped
+# file.  Unless elements are given they are list(range(n)), and then
+# no copy of the table is made in memory: its transpose is written to
+# a scratch file in scratch_dir (see transpose_file), which needs as
+# much free space as the table.
+#
+# The checks read the file as they go, so the process times in
+# results['timings'] are compute time; timings['io'] is the rest of
+# the elapsed time, mostly spent waiting for the disk.
+def check_table_file(path,dtype=None,elements=None,
+                     memory_budget=default_memory_budget,
+                     random_rounds=0,seed=None,latin_square=False,
+                     scratch_dir=None):
+    start_wall=time.perf_counter()
+    start_time=time.process_time()
+    table=map_table(path,dtype)
+    n=table.shape[0]
+    if elements is None:
+        elements=list(range(n))
+    G=group_table_checker(elements,table,test_mode=True,
+                          memory_budget=memory_budget,compact=False,
+                          random_rounds=random_rounds,seed=seed,
+                          latin_square=latin_square,scratch_dir=scratch_dir)
+    transpose_time=time.process_time()-start_time
+    results=G.test_table()
+    timings=results.setdefault('timings',{})
+    timings['transpose']=transpose_time
+    timings['io']=max(0.0,(time.perf_counter()-start_wall)
+                      -(time.process_time()-start_time))
+    return results
+
+
+
+#####################################################################
+# certificates                                                      #
+#####################################################################
+
+# For a group, the results of test_table are a proof which anyone
+# can check again without trusting the search which found it.  As
+# indices of elements, a certificate holds
+#
+#   cert['n']               : the number of elements
+#   cert['identity']        : the identity e
+#   cert['generators']      : the generating set S
+#   cert['inverse']         : the inverse of each element
+#   cert['x'],cert['y'],cert['z'] : the roadmap equations x_i*y_i=z_i
+#
+# saved as .json, or as .npz with the arrays in the narrowest index
+# dtype (about 4n entries in all).
+#
+# verify_certificate checks that the table is closed, that e is an
+# identity, that inverse gives inverses, and the roadmap equations,
+# and then checks just the batches of triples of test_table.  The
+# triples prove associativity whenever
+#
+# * S is made of distinct elements other than e;
+# * the z_i are distinct and, with e and S, make up all n elements;
+# * y_i is in S, and x_i is e, in S or z_k for some k < i;
+#
+# which is checked from the certificate alone.  No identity search,
+# inverse search or roadmap construction is done.
+
+#--------------------------------------------------------------------#
+# the certificate of results, from test_table for a group
+def certificate(results):
+    n=len(results['inverse_array'])
+    dtype=index_dtype(n)
+    roadmap=results['roadmap']
+    cert={'n':n,
+          'identity':int(results['identity']),
+          'generators':np.array(results['generators'],dtype=dtype),
+          'inverse':np.asarray(results['inverse_array'],dtype=dtype)
+          }
+    for key in ['x','y','z']:
+        cert[key]=np.array([eq[key] for eq in roadmap],dtype=dtype)
+    return cert
+
+certificate_arrays = ['generators','inverse','x','y','z']
+
+def save_certificate(cert,path):
+    if str(path).endswith('.json'):
+        with open(path,'w') as f:
+            json.dump({key:(np.asarray(value).tolist() if key in certificate_arrays else int(value))
+                       for key,value in cert.items()},f)
+    else:
+        np.savez(path,**cert)
+
+def load_certificate(path):
+    if str(path).endswith('.json'):
+        with open(path) as f:
+            cert=json.load(f)
+    else:
+        with np.load(path) as f:
+            cert={key:f[key] for key in f.files}
+    n=int(cert['n'])
+    dtype=index_dtype(n)
+    for key in certificate_arrays:
+        cert[key]=np.asarray(cert[key],dtype=np.int64).astype(dtype)
+    cert['n']=n
+    cert['identity']=int(cert['identity'])
+    return cert
+
+#--------------------------------------------------------------------#
+# What is wrong with cert as a certificate for a table of order n
+# (as text), or None
+def certificate_problem(cert,n):
+    if not cert['n']==n:
+        return f"the certificate is for {cert['n']} elements, not {n}"
+    e=cert['identity']
+    S=np.asarray(cert['generators'],dtype=np.int64)
+    inverse=np.asarray(cert['inverse'],dtype=np.int64)
+    x,y,z=[np.asarray(cert[key],dtype=np.int64) for key in ['x','y','z']]
+    if not (0 <= e < n):
+        return f"the identity {e} is not an element"
+    if not len(inverse)==n:
+        return f"{len(inverse)} inverses given for {n} elements"
+    if not (len(x)==len(y)==len(z)):
+        return "the roadmap arrays differ in length"
+    for name,X in [('generator',S),('inverse',inverse),('roadmap entry',np.concatenate([x,y,z]))]:
+        if len(X) > 0 and ((X.min() < 0) or (X.max() >= n)):
+            return f"a {name} is not an element"
+    if not (inverse[inverse]==np.arange(n)).all():
+        return "inverse is not an involution"
+    # rank[a] is -1 for e and S, i for z_i and n for anything else
+    rank=np.full(n,n,dtype=np.int64)
+    rank[e]=-1
+    rank[S]=-1
+    if not (len(S)==len(np.unique(S))) or (e in S):
+        return "the generators are not distinct elements other than the identity"
+    if not len(z)==n-1-len(S):
+        return f"{len(z)} roadmap equations, not {n-1-len(S)}"
+    if (rank[z] < n).any() or not (len(np.unique(z))==len(z)):
+        return "the roadmap products are not distinct elements outside the generators"
+    rank[z]=np.arange(len(z))
+    if not (rank[y]==-1).all():
+        i=int(np.flatnonzero(rank[y]!=-1)[0])
+        return f"roadmap equation {i} does not multiply by a generator"
+    if not (rank[x] < np.arange(len(x))).all():
+        i=int(np.flatnonzero(rank[x] >= np.arange(len(x)))[0])
+        return f"roadmap equation {i} multiplies an element not reached before it"
+    return None
+
+#--------------------------------------------------------------------#
+# Check table (an integer table with elements 0..n-1, perhaps memory
+# mapped) against cert, reading it from start to end twice, a block
+# of rows at a time so that the temporary arrays stay within
+# memory_budget:
+#
+# 1. closure, the identity row and column, the inverses and the
+#    roadmap equations, keeping the rows and columns of S
+#
+# 2. for each row z_j, the roadmap right triples (z_j,x_i,y_i) with
+#    i < j, and for each row z_i, the roadmap left triples
+#    (x_i,y_i,z_j) with j >= i, which read the row x_i as well
+#
+# The (s,g,t) triples only need the rows and columns of S, and are
+# checked in between.  Returns
+#
+#   results['verified']           : bool
+#   results['failed_property']    : 'certificate', 'closure', 'identity',
+#                                   'inverses', 'roadmap' or 'associativity'
+#
+# with the details as in test_table ('reason' for 'certificate',
+# 'failed_equation' [x,y,z] for 'roadmap'), and number_of_triples.
+# The first failing triple found is reported, which need not be the
+# first in batch order.  A failure other than closure or a failing
+# triple only means that cert does not prove that the table is a group.
+def verify_certificate(table,cert,memory_budget=default_memory_budget):
+    start_time=time.process_time()
+    n=table.shape[0]
+
+    def failure(results):
+        results['verified']=False
+        results['timings']={'verify':time.process_time()-start_time}
+        return results
+
+    problem=certificate_problem(cert,n)
+    if not (table.ndim==2 and table.shape[1]==n):
+        problem="the table is not square"
+    if problem is not None:
+        return failure({'failed_property':'certificate','reason':problem})
+
+    e=cert['identity']
+    S=np.asarray(cert['generators'],dtype=np.intp)
+    inverse=np.asarray(cert['inverse'],dtype=np.intp)
+    x,y,z=[np.asarray(cert[key],dtype=np.intp) for key in ['x','y','z']]
+    L=len(z)
+    S_size=len(S)
+    rank=np.full(n,-1,dtype=np.intp)   # of z in the roadmap
+    rank[z]=np.arange(L)
+    S_position=np.zeros(n,dtype=np.intp)
+    S_position[S]=np.arange(S_size)
+    y_position=S_position[y]
+    by_x=np.argsort(x,kind='stable')
+    x_sorted=x[by_x]
+    indices=np.arange(n,dtype=np.intp)
+
+    dtype=index_dtype(n)
+    S_rows=np.empty((S_size,n),dtype=dtype)
+    S_cols=np.empty((S_size,n),dtype=dtype)
+    rows=max(1,memory_budget//max(1,8*n))
+    for i0 in range(0,n,rows):
+        i1=min(n,i0+rows)
+        block=np.asarray(table[i0:i1])
+        if (block.max() >= n) or (block.min() < 0):
+            I,J=np.nonzero((block >= n)|(block < 0))
+            return failure({'failed_property':'closure',
+                            'failed_product':[i0+int(I[0]),int(J[0]),block[I[0],J[0]].item()]})
+        if (i0 <= e < i1) and not (block[e-i0]==indices).all():
+            return failure({'failed_property':'identity'})
+        if not (block[:,e]==indices[i0:i1]).all():
+            return failure({'failed_property':'identity'})
+        has_inverse=(block[np.arange(i1-i0),inverse[i0:i1]]==e)
+        if not has_inverse.all():
+            return failure({'failed_property':'inverses',
+                            'failed_inverse':i0+int(np.argmin(has_inverse))})
+        k0,k1=np.searchsorted(x_sorted,[i0,i1])
+        eqs=by_x[k0:k1]
+        holds=(block[x[eqs]-i0,y[eqs]]==z[eqs])
+        if not holds.all():
+            i=eqs[np.argmin(holds)]
+            return failure({'failed_property':'roadmap',
+                            'failed_equation':[int(x[i]),int(y[i]),int(z[i])]})
+        in_block=(S >= i0) & (S < i1)
+        S_rows[in_block]=block[S[in_block]-i0]
+        S_cols[:,i0:i1]=block[:,S].T
+
+    def associativity(triple,triple_type):
+        return failure({'failed_property':'associativity',
+                        'failed_triple':[int(a) for a in triple],
+                        'failed_triple_type':triple_type})
+
+    # (s,g,t) for s,t in S and all g other than e
+    g=np.delete(indices,e)
+    for k in range(S_size):
+        sg=S_rows[k][g]
+        for l in range(S_size):
+            bad=np.flatnonzero(S_cols[l][sg]!=S_rows[k][S_cols[l][g]])
+            if len(bad) > 0:
+                return associativity([S[k],g[bad[0]],S[l]],'S')
+
+    # roadmap right: (w*x_i)*y_i = w*z_i for w=z_j, i < j, and
+    # roadmap left: z_i*z_j = x_i*(y_i*z_j) for j >= i, where w=z_i.
+    # For right, the equations are taken in order of y_i, and for
+    # left, the rows in order of y_i, so that each lookup in a row or
+    # column of S is a gather along a whole block.
+    by_y=np.argsort(y_position,kind='stable')
+    y_starts=np.searchsorted(y_position[by_y],np.arange(S_size+1))
+    S_rows_z=S_rows[:,z]
+    rows=max(1,memory_budget//max(1,64*n))
+    for i0 in range(0,n,rows):
+        i1=min(n,i0+rows)
+        w=np.flatnonzero(rank[i0:i1] >= 0)+i0
+        if len(w)==0:
+            continue
+        block=np.asarray(table[i0:i1])[w-i0]
+        j=rank[w][:,None]
+
+        wz=np.take(block,z[by_y],axis=1)
+        wx=np.take(block,x[by_y],axis=1)
+        for k in range(S_size):
+            part=slice(y_starts[k],y_starts[k+1])
+            right=(wz[:,part]!=np.take(S_cols[k],wx[:,part])) & (by_y[None,part] < j)
+            if right.any():
+                p,c=np.argwhere(right)[0]
+                i=by_y[part][c]
+                return associativity([w[p],x[i],y[i]],'roadmap right')
+
+        i=rank[w]
+        wz=np.take(block,z,axis=1)
+        for k in range(S_size):
+            r=np.flatnonzero(y_position[i]==k)
+            parents=np.asarray(table[x[i[r]]])
+            left=(wz[r]!=np.take(parents,S_rows_z[k],axis=1)) & (np.arange(L)[None,:] >= j[r])
+            if left.any():
+                p,c=np.argwhere(left)[0]
+                return associativity([x[i[r[p]]],y[i[r[p]]],z[c]],'roadmap left')
+
+    triples=S_size*S_size*(n-1)+L*L
+    return {'verified':True,
+            'number_of_triples':triples,
+            'timings':{'verify':time.process_time()-start_time}
+            }
+
+#--------------------------------------------------------------------#
+# verify_certificate for a table stored on disk, read through the
+# memory map, with the certificate (or the path of one) cert
+def verify_table_file(path,cert,dtype=None,memory_budget=default_memory_budget):
+    start_wall=time.perf_counter()
+    start_time=time.process_time()
+    if not isinstance(cert,dict):
+        cert=load_certificate(cert)
+    results=verify_certificate(map_table(path,dtype),cert,memory_budget)
+    results['timings']['io']=max(0.0,(time.perf_counter()-start_wall)
+                                 -(time.process_time()-start_time))
+    return results
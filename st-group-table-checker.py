@@ -1,32 +1,20 @@
 import streamlit as st
 import matplotlib.pyplot as plt
-import math
+import io
+import threading
 import time
-import numpy as np  # numpy arrays seem fastest for table ops
-                    # particularly transpose
+import numpy as np
+
+import group_table_checker as checker  # the headless checking engine
+import table_cache  # tables and results kept across reruns and sessions
+from workloads import (permute, symmetric_group, elementary_two_group,
+                       table_tweak, random_table)
 
 #import pandas as pd # only used for reading CSV file
 
 # shell command:
 # streamlit run st-group-table-checker.py
 
-# using np array for group table makes things much faster
-# than the original code using lists
-#
-# table.max() gives max
-# table.min() gives min
-# so closure is easy
-#
-# comparing arrays: (a==b).all()
-# instead of list comprehension
-# [a[b[j]] for j in x]
-# use a[b[x]] with arrays
-#
-# column of array: a[:,j] but row of transpose is faster
-
-
-
-
 # new feature: test mode, allows testing of algorithm on much bigger 
 # tables
 #
@@ -42,245 +30,57 @@ import numpy as np  # numpy arrays seem fastest for table ops
 #
 #
 
+
+# print_status draws tables up to this order with their entries, and
+# bigger ones as images at most image_size pixels across
+labelled_table_size = 16
+image_size          = 512
+
 #####################################################################
 # streamlit code to demonstrate how to test whether a (n x n) table #
 # defines a group, checking only n^2 ish triples for associativity  #
+#                                                                   #
+# the checking itself is done by checker.group_table_checker; here  #
+# we only provide its output hooks                                  #
 #####################################################################
-class group_table_checker(object):
-
-    ##################################################################
-    #  versions of list and dict which allow setattr                 #
-    ##################################################################
-    class List(list): 
-        def __init__(self, initial_data=None):
-            if initial_data is None:
-                initial_data = []
-            super().__init__(initial_data)
-    #---------------------------------------------------------------#
-    class Dict(dict):
-        def __init__(self, initial_data=None):
-            if initial_data is None:
-                initial_data = []
-            super().__init__(initial_data)
-
-    ##################################################################
-    # attribute to make appending to roadblock work with cell colors #
-    ##################################################################
-    def roadmap_add(self,equation):
-        self.roadmap.append(equation)
-        if not self.test_mode:
-            i=equation['x']
-            j=equation['y']
-            self.cell_colors[i][j]=self.road_color
-        
-    ##################################################################
-    # attributes to make a FIFO queue out of a list                  #
-    ##################################################################
-    def Queue_pop(self):
-        item=self.Queue[self.Queue.ptr]
-        if not self.test_mode:
-            i=item['x']
-            j=item['s']
-            self.cell_colors[i][j]=self.crossed
-        self.Queue.ptr=self.Queue.ptr+1
-        return item
-    #---------------------------------------------------------------#
-    def Queue_size(self):
-        return len(self.Queue)-self.Queue.ptr
-    
-    ##################################################################
-    # attributes to make H and S affect Queue appropriately          #
-    ##################################################################
-    def H_add(self,x):
-        self.H[x] = True
-        
-        for s in self.S:
-            self.Queue.append({'x':x,'s':s})
-
-        if not self.suppress_output:
-            self.row_colors[x]=self.H_color
-            for j in range(0,self.n):
-                self.cell_colors[x][j]=self.H_color
-            for s in self.S:
-                self.cell_colors[x][s]=self.Q_color
-            self.H_string=self.H_string[:-3]+f",{self.element[x]}"+r"\}$"
-            
-    #---------------------------------------------------------------#
-    def S_add(self,s):
-        self.S.append(s)
-        for x in self.H:
-            self.Queue.append({'x':x,'s':s})
-
-        if not self.suppress_output:
-            self.col_colors[s]=self.S_color
-            for i in range(0,self.n):
-                self.cell_colors[i][s]=self.S_color
-            for x in self.H:
-                self.cell_colors[x][s]=self.Q_color
-        if len(self.S)>1:
-            self.S_string=self.S_string[:-3]+f",{self.element[s]}"+r"\}$"
-        else:
-            self.S_string=self.S_string[:-3]+f"{self.element[s]}"+r"\}$"
-
-    ##################################################################
-    # Initialize everything we need for testing the table.           #
-    #                                                                #
-    # The object, once initialized, should be stored in              #
-    # st.session_state so we can resume computation after            #
-    # a button press or other interaction                            #
-    ##################################################################
-    def __init__(self,element,table, test_mode=False):
-        self.test_mode    = test_mode
-        self.element      = element
-        self.table        = table
-        self.n            = len(element)
-        self.index        = {}
-
-        # we color the table to indicate progress
-        if not test_mode:
-            self.cell_colors  = []
-            self.col_colors   = []
-            self.row_colors   = []
-            
-            self.plain        = "white"     # typical table entry
-        
-            self.H_color      = "yellow"    # row index is an element of H
-        
-            self.S_color      = "pink"      # column index is an element of S
-        
-            self.Q_color      = "orange"    # row index in H, col index in S
-            # unprocessed queue item
-                                        
-            self.road_color   = "#e3592e"   # row index in H, col index in S
-            # processed cell which produced
-            # a roadmap equation
-                                        
-            self.crossed      = "#d6a240"   # row index in H, col index in S
-            # processed cell which did not
-            # produce roadmap equation
-
-        # check that the table is the right shape
-        if not table.shape==(self.n,self.n):
-            raise ValueError(f"{self.n} elements given but table is not {self.n} by {self.n}")
-
-        # check that the list of elements consists of distinct entries
-        # making a dictionary in the process that maps from elements to
-        # indices
-        for a in element:
-            i=len(self.index)
-            if a in self.index:
-                raise ValueError(f"element {a} occurs twice")
-            self.index[a]=i
-
-        if element==list(range(self.n)):
-            self.op = self.table 
-        else:
-            # store the group table in terms of indices of elements
-            self.op = np.zeros((self.n,self.n),dtype=int)
-            
-            for i in range(self.n):
-                for j in range(self.n):
-                    x=self.table[i][j]
-                    if x in self.index:
-                        k=self.index[x]
-                    else:
-                        k=-1 # if the set is not closed
-                             # there will be -1's in the table
-                    self.op[i][j] = k
-        self.opT    = self.op.T
-        self.tableT = self.table.T
-        
-        if not test_mode:
-            # initialize the table to have white background
-            for a in element:
-                self.row_colors.append(self.plain)
-                self.col_colors.append(self.plain)
-                this_row_colors=[]
-                for b in element:
-                    this_row_colors.append(self.plain)
-                self.cell_colors.append(this_row_colors)
-                
-        self.roadmap = self.List([]) # list of equations. keys 'x', 'y', and 'z'
-        setattr(self.roadmap,"add",self.roadmap_add)
-        self.roadmap_string="roadmap equations:\n\n"
-        
-        self.Queue   = self.List([]) # list of items. keys 'x' and 's'
-        
-        setattr(self.Queue,"ptr",0)                # hack to make
-        setattr(self.Queue,"pop",self.Queue_pop)   # it FIFO although
-        setattr(self.Queue,"size",self.Queue_size) # that's not required
-        
-        self.H        = self.Dict({})
-
-        #set H.add to H_add
-        setattr(self.H,"add",self.H_add) # when we add x to H
-                                         # all x,S pairs go on Queue
-                                               
-        self.S        = self.List([])
-        self.S_string = r"$S=\{\}$"
-
-        # set S.add to S_add
-        setattr(self.S,"add",self.S_add) # when we add s to S
-                                         # all H,s pairs go on Queue
-                                         
-        self.untried=list(range(self.n-1,-1,-1))
-        # pop this when we need to try adding to S
-        # we try the elements in order
-
-        # need variable names which don't
-        # conflict with group element names
-
-        self.a_name='a'
-        self.b_name='b'
-        self.c_name='c'
-        names=list("astuxAUbcdefghijklmnopqrvwBCDIJKLMNOPQR")
-        i=0
-        while (i<len(names)) and ((names[i] in element) or (chr(ord(names[i])+1) in element) or (chr(ord(names[i])+2) in element)):
-            i=i+1
-        if (i<len(names)):
-            self.a_name=names[i]
-            self.b_name=chr(ord(names[i])+1)
-            self.c_name=chr(ord(names[i])+2)
-            
-        self.pause_between_pages = False
-        self.suppress_output     = True
-        self.number_of_triples   = 0
-        self.roadmap_step        = 0
-        self.introduced          = False
-        
-    ##################################################################
-    # End of __init__                                                #
-    ##################################################################
-
-    ##################################################################
-    # Subroutines                                                    #
-    ##################################################################
+class group_table_checker(checker.group_table_checker):
 
+    #----------------------------------------------------------------#  
+    # Display some (markdown) text
+    def write(self,text):
+        if self.recording:
+            super().write(text)
+        else:
+            st.write(text)
 
     #----------------------------------------------------------------#  
     # Wait for reader to click "Proceed"
     def pause(self):
-        if self.pause_between_pages:
+        if self.recording:
+            super().pause()
+        elif self.pause_between_pages:
             done=st.button("Proceed",type="primary")
             st.stop()
         else:
             st.write("----------")
             
     #----------------------------------------------------------------#  
-    # Print our current status
-    def print_status(self):
+    # Draw the table with its entries, as PNG data.  Matplotlib needs
+    # a few seconds for this once the table has a few hundred cells.
+    def table_figure(self,status):
+        palette=np.array(self.palette)
         fig, ax = plt.subplots()
         ax.axis('off')  # Hide axes
         ax.set_aspect('equal')
         table = ax.table(cellText=self.table,
-                         cellColours=self.cell_colors,
+                         cellColours=palette[status['cells']],
                          cellLoc='center',
                          loc='center',
                          rowLabels=self.element,
-                         rowColours=self.row_colors,
+                         rowColours=palette[status['rows']],
                          rowLoc='center',
                          colLabels=self.element,
-                         colColours=self.col_colors,
+                         colColours=palette[status['cols']],
                          colLoc='center',
                          )
         #table.auto_set_font_size(False)
@@ -297,47 +97,113 @@ class group_table_checker(object):
                 cell.set_width(1/(self.n+.5))
             else:
                 cell.set_width(1/(2*self.n+1))
+        png=io.BytesIO()
+        fig.savefig(png,format='png')
+        plt.close(fig)
+        return png.getvalue()
 
+    #----------------------------------------------------------------#  
+    # The picture of the table for a status.  Small tables are drawn
+    # with their entries, bigger ones just as colors, one pixel per
+    # entry (the engine shrinks tables bigger than image_size).
+    def status_figure(self,status):
+        if self.n <= labelled_table_size:
+            return self.table_figure(status)
+        image=self.status_image(image_size,status)
+        # blow up small images ourselves, since the browser would
+        # blur them
+        scale=max(1,image_size//len(image))
+        return np.repeat(np.repeat(image,scale,axis=0),scale,axis=1)
+
+    #----------------------------------------------------------------#  
+    # Print our current status
+    def print_status(self):
+        if self.recording:
+            super().print_status()
+        else:
+            self.show_status(self.status())
+
+    #----------------------------------------------------------------#  
+    # Show a status, either the current one or one from the log.
+    # Pictures of the statuses on the page being shown are kept, by
+    # event number, so showing the page again costs nothing.
+    def show_status(self,status,event=None):
         col1,col2,col3=st.columns(3)
-        col1.pyplot(fig)
+        if event is None:
+            col1.image(self.status_figure(status))
+        else:
+            if not event in self.figures:
+                self.figures[event]=self.status_figure(status)
+            col1.image(self.figures[event])
 
         col2.write("*Group properties:*")
-        if hasattr(self,"closed"):
+        if status['closed']:
             col2.write("Closure: verified.")
         else:
             col2.write("Closure: checking now.")
         
-        if hasattr(self,"identity"):
-            col2.write("Identity element is $"+(self.element[self.identity])+"$.")
-        elif hasattr(self,"closed"):
+        if status['identity'] is not None:
+            col2.write(f"Identity element is ${self.element[status['identity']]}$.")
+        elif status['closed']:
             col2.write("Identity: checking now.")            
         else:
             col2.write("Identity:")            
             
-        if hasattr(self,"inverse"):
+        if status['inverses']:
             col2.write("Inverses: verified.")
-        elif hasattr(self,"identity"):
+        elif status['identity'] is not None:
             col2.write("Inverses: checking now.")
         else:
             col2.write("Inverses: ")
 
-        if hasattr(self,"inverse"):
-            if len(self.H) < self.n:
+        if status['inverses']:
+            if status['H'] < self.n:
                 col2.write("Associativity: computing $S$.")
             else:
                 col2.write("Associativity: checking now.")
         else:
             col2.write("Associativity: ")
                 
-        if hasattr(self,"inverse"):
+        if status['inverses']:
             col3.write("*Summary:*")
-            col3.write(self.S_string)
-            if len(self.H) < self.n:
-                col3.write(self.H_string)
-            if len(self.roadmap) > 0:
-                col3.write("R"+self.roadmap_string[1:])
-            
-        plt.close(fig)
+            col3.write(self.set_string("S",self.S.array()[:status['S']]))
+            if status['H'] < self.n:
+                col3.write(self.set_string("H",self.H.array()[:status['H']]))
+            if status['roadmap'] > 0:
+                col3.write("R"+self.roadmap_text(status['roadmap'])[1:])
+
+    #----------------------------------------------------------------#  
+    # One section at a time: the checks are run once, on the first
+    # call, recording the output, and each click on "Proceed" shows
+    # the next recorded page.  Otherwise the output is shown as the
+    # checks run.
+    def test_table(self):
+        if not self.introduced:
+            self.intro()
+        if not self.pause_between_pages:
+            return super().test_table()
+
+        if not hasattr(self,"pages"):
+            self.results=self.record()
+            self.page=0
+            self.figures={}
+        elif st.session_state.get("proceed"):
+            self.page=min(self.page+1,len(self.pages)-1)
+            self.figures={}
+
+        if len(self.pages) > 0:
+            start,stop=self.pages[self.page]
+            for i in range(start,stop):
+                event=self.events[i]
+                if event[0]=='write':
+                    st.write(event[1])
+                elif event[0]=='status':
+                    self.show_status(self.replay_status(i),event=i)
+        if self.page < len(self.pages)-1:
+            st.button("Proceed",type="primary",key="proceed")
+            st.stop()
+        return self.results
+
     #----------------------------------------------------------------#  
     # Just explain that the user should read everything before 
     # clicking
@@ -393,1019 +259,6 @@ class group_table_checker(object):
             st.stop()
         
 
-    
-    #----------------------------------------------------------------#  
-    # For all elements a and b, is the a,b entry
-    # in the table always an element?
-    
-    def test_closure(self):
-        if not self.suppress_output:
-            self.print_status()
-            st.write("""
-            # Closure
-            
-            Testing whether the set is closed under the operation.
-            This means making sure that every entry in the table
-            is actually an element of the set.
-            
-            """)
-        if (self.op.max() >= self.n) or (self.op.min() < 0):
-            I,J=np.where(np.logical_or((self.op>=self.n),(self.op<0)))
-            i=I[0]
-            j=J[0]
-            a=self.element[i]
-            b=self.element[j]
-            c=self.table[i][j]
-            self.failed_product = [a,b,c]
-            if not self.test_mode:
-                st.write(f"The element :red[${c}={a}*{b}$] is not in the set,")
-                st.write("so this is not a group table.")
-            return False
-        self.closed=True
-        if not self.suppress_output:
-            st.write("It checks out! The set is closed under the operation")
-        return True
-    
-    #----------------------------------------------------------------#    
-    # is there a two-sided identity?
-    # note that if there is, then there
-    # cannot be a separate one-sided identity
-
-    def test_identity(self):
-        text="""
-        # Identity
-        
-        Testing whether there is an identity element.
-
-        The row indexed by the identity element should look
-        exactly like the list of elements.
-        
-        """
-        # first find identity row of table
-        i = 0
-        while (i<self.n) and not (self.table[i] == self.element).all():
-            i = i+1
-
-        if(i == self.n):
-            if not self.suppress_output:
-                self.print_status()
-                st.write(text)
-                st.write(":red[There is no such row, so there is no identity].")
-                st.write("This is not a group table.")
-            else:
-                if not self.test_mode:
-                    st.write(":red[There is no identity].")
-            return False
-
-        # we have a left identity
-        identity = i
-        if not self.suppress_output:
-            self.row_colors[i]="yellow"
-            self.col_colors[i]="yellow"
-            for j in range(0,self.n):
-                self.cell_colors[i][j]="yellow"
-                if self.table[i][j]==self.table[j][i]:
-                    self.cell_colors[j][i]="yellow"
-                else:
-                    self.cell_colors[j][i]="red"
-                    
-            self.print_status()
-
-            self.row_colors[i]=self.plain
-            self.col_colors[i]=self.plain
-            for j in range(0,self.n):
-                self.cell_colors[i][j]=self.plain
-                if self.table[i][j]==self.table[j][i]:
-                    self.cell_colors[j][i]=self.plain
-                else:
-                    self.cell_colors[j][i]=self.plain
-
-            st.write(text)
-        
-            st.write(f"""
-            We found a row that looks right!
-            ${self.element[identity]}$ is a left identity.
-
-            We have highlighted the ${self.element[identity]}$ row and
-            the ${self.element[identity]}$ column.  Now we check
-            whether it's also a right identity.
-            """)
-        
-
-        # check if it's also a right identity
-        if not (self.tableT[identity] == self.element).all():
-            J=np.where(self.tableT[identity]!=self.element)
-            j=J[0][0]
-            a=self.element[j]
-            b=self.table[j,identity]
-            if not self.suppress_output:                
-                st.write(f"It is not! We have :red[${a}*{self.element[identity]}={b}$].")
-                st.write("This is not a group table.")
-            else:
-                if not self.test_mode:
-                    st.write(":red[There is no identity].")                
-            return False
-            
-        if not self.suppress_output:                
-            st.write("""
-            It is!
-            
-            """)
-        self.identity = identity
-
-        return True
-
-    #----------------------------------------------------------------#    
-    # Are there inverses ?
-
-    def test_inverses(self):
-        inverse = {}
-        identity=self.identity
-        a_name=self.a_name
-        b_name=self.b_name
-        c_name=self.c_name
-        
-        if not self.suppress_output:                
-            for i in range(0,self.n):
-                for j in range(0,self.n):
-                    if(self.table[i][j]==self.element[identity]):
-                        self.cell_colors[i][j]="yellow"
-                        
-            self.print_status()
-
-            # make table plain again
-            for i in range(0,self.n):
-                for j in range(0,self.n):
-                    if(self.table[i][j]==self.element[identity]):
-                        self.cell_colors[i][j]=self.plain
-
-        
-            st.write(f"""
-            # Inverses
-            
-            Testing whether all elements have two-sided inverses.
-            
-            For every element ${a_name}$, we seek an element ${b_name}$ such
-            that ${a_name}*{b_name}={b_name}*{a_name}={self.element[identity]}$.
-            
-            To make it easier to check, we have highlighted
-            the identity element ${self.element[identity]}$
-            wherever it occurs in the table.  For there to
-            be inverses, we must have a highlighted entry in every
-            row and column, located symmetrically about the diagonal.
-            (Technically there must be a *subset* of the
-            highlighted entries with this property.)
-            """)
-            
-        I,J=np.where(np.logical_and(self.op==identity,self.opT==identity))
-        for i in range(self.n):
-            if not i in I:
-                a=self.element[i]
-                self.failed_inverse=a
-                if not self.test_mode:
-                    st.write(f"""
-                    :red[The element ${a}$ has no inverse].
-                    This is not a group table.
-                    
-                    """)
-                return False
-                
-            elif not i in inverse:
-                j=J[np.where(I==i)[0]][0]
-                inverse[i]=j
-                inverse[j]=i
-            
-        if not self.suppress_output:
-            st.write("All elements have inverses!")
-        self.inverse=inverse
-        return True
-
-
-    #----------------------------------------------------------------#
-    # check whether a triple satisfies associativity
-    #
-    # the optional arguments ab and bc are for
-    # cases in which many triples with either the same
-    # first two elements or same last two elements are to be tested.
-    # in such cases we require only three table lookups per triple
-    # instead of four
-    
-    def check_triple(self,a,b,c,ab=False,bc=False):
-        self.number_of_triples=self.number_of_triples+1
-        op=self.op
-        if ab==False:
-            ab   = op[a][b]
-        if bc==False:
-            bc   = op[b][c]
-        a_bc = op[a][bc]
-        ab_c = op[ab][c]
-
-        if a_bc == ab_c:
-            if not self.test_mode:
-                allgood=r"${\ \ \ \ "+f"({self.element[a]}*{self.element[b]})*{self.element[c]}={self.element[ab]}*{self.element[c]}={self.element[ab_c]}={self.element[a]}*{self.element[bc]}={self.element[a]}*({self.element[b]}*{self.element[c]})"+r"\ \ \ \ \checkmark"+r"}$"
-                st.write(f"{self.number_of_triples}. :green[{allgood}]")
-            return True
-        else:
-            self.failed_triple=[self.element[a],self.element[b],self.element[c]]
-            if not self.test_mode:
-                violation=r"${\ \ \ \ "+f"({self.element[a]}*{self.element[b]})*{self.element[c]}={self.element[ab]}*{self.element[c]}={self.element[ab_c]}"+r"\neq "+f"{self.element[a_bc]}={self.element[a]}*{self.element[bc]}={self.element[a]}*({self.element[b]}*{self.element[c]})"+r"}$"
-                st.write(f"{self.number_of_triples}. :red[{violation}]")
-                st.write("This is not a group table")
-            return False
-
-    #----------------------------------------------------------------#
-    # before adding an element s to S, we check that the entries
-    # in the s column with rows indexed by elements of H are distinct
-    # from each other and not in H
-    #
-    # if this fails we can quickly find a triple violating associativity
-    #
-    # if this always holds, then we must have that |H| doubles with
-    # every addition to S, so |S| never exceeds log_2(n)
-    
-    def enforce_growth(self,s):
-        H=self.H
-        S=self.S
-        op=self.op
-        a=self.a_name
-        b=self.b_name
-        c=self.c_name
-        roadmap=self.roadmap
-        identity=self.identity
-        inverse=self.inverse
-        Growth = {}
-        for x in H:
-            y = op[x][s]
-            
-            if y in Growth:
-                z = Growth[y] # z * s = x * s = y
-                if not self.suppress_output:
-                    st.write(f"""
-                    We have a duplicate in the ${self.element[s]}$ column: ${self.element[z]}*{self.element[s]}={self.element[x]}*{self.element[s]}={self.element[y]}$.
-                    At most two triples to check before we find a violation:
-                    """)
-                self.failed_triple_type='right inverse'
-                if self.check_triple(z,s,inverse[s]):
-                    self.check_triple(x,s,inverse[s])
-                    return False
-
-            Growth[y] = x
-            if y in H:
-                # we have x * s in H
-                if not self.suppress_output:
-                    st.write(f"""
-                    We have ${self.element[x]}*{self.element[s]}={self.element[y]}$, which is an element of $H$.
-                    A few triples to check before we find a violation:
-                    """)
-                xinv = inverse[x]
-                if not self.check_triple(xinv,x,s):
-                    self.failed_triple_type='left inverse'
-                    return False
-
-                # we have s = xinv * y
-                if xinv in H:
-                    self.failed_triple_type='x inverse roadmap'
-                    if not self.suppress_output:
-                        st.write(f"""
-                        We have ${self.element[xinv]}*{self.element[y]}={self.element[s]}$, where both ${self.element[xinv]}$ and
-                        ${self.element[y]}$ are in $H$.  We will take the first
-                        roadmap equation ${a}*{b}={c}$ such that ${self.element[xinv]}*{c}$
-                        is not an element of $H$ (this exists because ${c}={self.element[y]}$
-                        works), and we will see that the
-                        triple $({self.element[xinv]},{a},{b})$ fails.
-                        """)
-                    
-                    for i in range(0,len(roadmap)):
-                        z_i = roadmap[i]['z']
-                        if not op[xinv][z_i] in H:
-                            x_i = roadmap[i]['x']
-                            y_i = roadmap[i]['y']
-                            
-                            if not self.suppress_output:
-                                st.write(f"""
-				Found roadmap equation ${self.element[x_i]}*{self.element[y_i]}={self.element[z_i]}$
-                                with ${self.element[xinv]}*{self.element[z_i]}$ not in $H$.
-                                """)
-                            
-                            self.check_triple(xinv,x_i,y_i)
-                            return False
-                        # should never reach this line
-                    assert False, "unreachable (?) line"
-
-                    
-                else: #xinv not in H
-                    if not self.suppress_output:
-                        st.write(f"""
-                        We have ${self.element[x]}*{self.element[xinv]}={self.element[identity]}$, where ${self.element[x]}$ is
-                        in $H$ but ${self.element[xinv]}$ is not.
-                        We will look for a roadmap equation
-                        ${a}*{b}={c}$ such that ${self.element[x]}*{c}$
-                        is not an element of $H$. 
-
-                        There may not be such an equation, but if
-                        there is, then the triple ${self.element[x]},{a},{b}$
-                        must fail.
-                        """)
-                    
-                    for i in range(0,len(roadmap)):
-                        z_i = roadmap[i]['z']
-                        if not op[x][z_i] in H:
-                            x_i = roadmap[i]['x']
-                            y_i = roadmap[i]['y']
-                            
-                            self.failed_triple_type='x roadmap'
-                            if not self.suppress_output:
-                                st.write(f"""Found roadmap equation
-                                ${self.element[x_i]}*{self.element[y_i]}={self.element[z_i]}$ with ${self.element[x]}*{self.element[z_i]}$
-                                not in $H$.""")
-
-                            self.check_triple(x,x_i,y_i)
-                            return False
-
-                    if not self.suppress_output:
-                        st.write(f"""
-                        There is no such equation, so
-                        the ${self.element[x]}$ row of the table
-                        must have a repeated entry (since the ${self.element[xinv]}$
-                        column as well as all the $H$ columns
-                        contain elements of $H$).
-                        """)
-                    # x * maps H to H
-                    self.failed_triple_type='xH'                        
-                    xH = {identity:xinv}
-                    for v in H:
-                        xv = op[x][v]
-                        if xv in xH:
-                            u = xH[xv]
-                            if not self.suppress_output:
-                                st.write(f"""
-                                We have ${self.element[x]}*{self.element[u]}={self.element[x]}*{self.element[v]}$ so one of the
-                                two triples $({self.element[xinv]},{self.element[x]},{self.element[u]})$ and
-                                $({self.element[xinv]},{self.element[x]},{self.element[v]}$ must fail.
-                                """)
-                            if self.check_triple(xinv,x,u):
-                                self.check_triple(xinv,x,v)
-                            return False
-                        else:
-                            xH[xv] = v
-                        
-                    # should never reach this line
-                    assert False, "unreachable (??) line"
-        return True
-    
-    #----------------------------------------------------------------#
-    # We need to undo the table coloration sometimes
-    def plain_table(self):
-        for i in range(0,self.n):
-            self.row_colors[i]=self.plain
-            self.col_colors[i]=self.plain
-            for j in range(0,self.n):
-                self.cell_colors[i][j]=self.plain
-
-    ##################################################################
-    # End of subroutines                                             #
-    ##################################################################
-    
-
-    ##################################################################
-    # Main routines                                                  #
-    ##################################################################
-
-    #----------------------------------------------------------------#
-    # Find a generating set and roadmap
-
-    def find_roadmap(self):
-        
-        identity= self.identity
-        element = self.element
-        op      = self.op
-        n       = self.n
-        roadmap = self.roadmap
-        Queue   = self.Queue
-        H       = self.H
-        S       = self.S
-        untried = self.untried
-
-
-        # start with H = {identity}
-        if len(H)==0:
-            H[identity]=True
-            
-            if not self.suppress_output:            
-                i=identity
-                self.row_colors[i]=self.H_color
-                for j in range(0,n):
-                    self.cell_colors[i][j]=self.H_color
-                self.H_string=r"$H=\{"+f"{self.element[identity]}"+r"\}$"
-
-                a=self.a_name
-                b=self.b_name
-                c=self.c_name
-                st.write(f"""
-                # Associativity
-                ## Finding a generating set
-                
-                Before testing the table for associativity,
-                we will compute a *generating set* $S$, that is,
-                a set such that we can express every element (other
-                than the identity) as a product of elements of $S$.
-                
-                As we compute $S$, we will keep track of the set $H$
-                of elements we know how to express as products of
-                elements of $S$.  We start with $H={self.element[identity]}$,
-                since ${self.element[identity]}$ is the empty product.
-                And any time we
-                add an element to $S$, we may add it to $H$ as well.
-                
-                This process will be indicated by coloring the table as
-                follows: rows indexed by elements of $H$ will be
-                highlighted in yellow. Columns indexed by
-                elements of $S$ will be highlighted in pink. Where
-                these rows and column intersect, the table will initially
-                by highlighted in orange.
-                
-                We process each orange position at most once.
-                Let $({a},{b})$ be the indices of an orange position,
-                so ${a}$ is in $H$ and ${b}$ is an element of $S$.
-                We examine the element ${c}={a}* {b}$ in that
-                orange position.
-                
-                
-                  - Case 1: ${c}$ is not in $H$.
-
-                     * Add ${c}$ to $H$, highlighting the ${c}$ row
-                       yellow.
-
-                     * Change the $({a},{b})$ position from orange to red.
-
-                     * Record the equation ${c}={a}* {b}$ on our
-                       *road map*.
-
-                  - Case 2: Change the $({a},{b})$ position to grey-orange.
-
-                Think of $H$ as being *known territory*.  The road map
-                records how to get to each newly reached element of
-                $H$ from previously reached elements.
-
-                When there are no orange positions, if there are any elements
-                ${a}$ not in $H$, we will pick one and try to add it to $S$.
-                Before adding ${a}$ to $S$, however, we check that the
-                yellow entries in the ${a}$ column are distinct from each
-                other and not in $H$.  If this condition fails, we will
-                quickly be able to find a triple violating associativity.
-                On the other hand, if this condition always holds, then
-                the set $S$ will be small.  For a set of size ${self.n}$,
-                we will have $|S|$ at most ${math.floor(math.log2(self.n))}$.
-        
-                Once every element has been added to $H$, we will be ready to
-                start testing triples.
-
-                """)
-                self.pause()
-
-                  
-        while len(H) < n:
-
-            if not self.suppress_output:                           
-                self.print_status()
-                self.roadmap_step=self.roadmap_step+1
-                st.write(f"""
-                ## Finding a generating set, step {self.roadmap_step}
-                """)
-
-            
-            # close H under right multiplication by S
-            if Queue.size() > 0:
-                item=Queue.pop()
-
-                x = item['x']
-                y = item['s']
-                z = op[x][y]
-
-                if not self.suppress_output:            
-                
-                    st.write(f"""
-                    Processing orange entry in position $({self.element[x]},{self.element[y]})$.
-                    
-                    We find ${self.element[x]}*{self.element[y]}={self.element[z]}$...
-                    
-                    """)
-                
-                if not z in H:
-                    H.add(z) # appends S,z pairs to Queue
-                    roadmap.add({'x':x, 'y':y, 'z':z}) #equation x * y = z
-                    if not self.test_mode:
-                        self.roadmap_string=self.roadmap_string+f"   - ${self.element[x]}*{self.element[y]}={self.element[z]}$\n"
-                    if not self.suppress_output:            
-                        st.write(f"""
-                        ... and ${self.element[z]}$ is not in $H$.  So we add ${self.element[z]}$ to $H$ and
-                        add ${self.element[x]}*{self.element[y]}={self.element[z]}$ to our list of roadmap equations.
-                        
-                        """)
-                        self.pause()
-                    
-                else:
-                    if not self.suppress_output:            
-                    
-                        st.write(f"""
-                        ... and ${self.element[z]}$ is already in $H$, so we do nothing here.
-                        
-                        """)
-                        
-                        self.pause()
-
-            else:
-                if not self.suppress_output:            
-
-                    st.write("""
-                    There are no plain orange positions. This means that
-                    $H$ is closed under right multiplication by elements of $S$.
-                    In order to make progress, we must find some element not
-                    in $H$ and add it to $S$.
-
-                    """)
-                
-                
-                # find some s in G \ H
-                s=untried.pop()
-                while s in H:
-                    s=untried.pop()
-
-                if not self.suppress_output:            
-                    
-                    st.write(f"""
-                    Trying the element ${self.element[s]}$.
-                    
-                    We have to check that the yellow entries in the
-                    ${self.element[s]}$ column are distinct from each other and
-                    not already in $H$.  If that fails, then we can quickly
-                    find a triple violating associativity.
-                    
-                    """)
-
-                # enforce growth condition
-                if not self.enforce_growth(s):
-                    return False
-
-                if not self.suppress_output:                            
-                    st.write(f"""
-                    The element ${self.element[s]}$ checks out! adding it to both $H$ and $S$.
-                    
-                    """)
-                
-                # add s to both S and H
-                S.add(s) # appends H,s pairs to Queue
-                H.add(s) # appends s,S pairs to Queue
-                
-                if not self.suppress_output:            
-                    self.pause()
-                 
-        self.found_roadmap=True
-        if not self.suppress_output:                    
-            self.print_status()
-            st.write(f"""
-            We now have $|H|={n}$, so $S$ is a generating set.
-            """)
-            self.plain_table()
-            self.pause()
-        return True
-    
-    def test_triples(self):
-
-        n       = self.n
-        identity= self.identity
-        op      = self.op
-        opT     = self.opT
-        S       = self.S
-        S_size  = len(S)
-        roadmap = self.roadmap
-        a       = self.a_name
-        b       = self.b_name
-        c       = self.c_name
-        element = self.element
-
-        # the triples come in batches
-
- 
-        if not hasattr(self,'batch_count'):
-            self.batch_count=0
-            if not self.suppress_output:                        
-                st.write(f"""
-                # Associativity
-                ## Checking triples
-                """)
-                st.write(f"""
-                Now that we have our generating set {self.S_string}
-                together with {self.roadmap_string}
-                
-                """)
-                st.write(f"""
-                We are ready to start checking triples of elements
-                $({a},{b},{c})$, testing whether
-                $$
-                ({a}*{b})*{c}={a}*({b}*{c}).
-                $$
-                If ever that fails, we are done: we can safely conclude
-                that the table is not a group table.
-                
-                On the other hand, suppose every triple we check passes its
-                test? At what point can we conclude that associativity holds
-                for *all* triples? Must we actually test all ${n}^3={n*n*n}$
-                triples?
-                
-                We will see that if we are careful, we need only test
-                ${(n-S_size-1)*(n-S_size-1)+(n-1)*S_size*S_size}$ triples.  We will organize
-                the triples into *batches*, each of which has a purpose
-                which we will state as we go.
-                
-                Each batch will have two of the elements ${a},{b},{c}$
-                fixed while the other varies.  We never need to check
-                a triple that includes ${self.element[identity]}$ since those would
-                pass automatically.  So the maximum batch size is ${n-1}$.
-                
-                   - A batch for which ${a}$ and ${c}$ are fixed will 
-                     establish that the operation of
-                     left-multiplying an element by ${a}$ *commutes*
-                     with the operation of right-multiplying an element
-                     by ${c}$. That is, applying those two operations,
-                     in either order, to all elements ${b}$ yields the
-                     same result (assuming all triples 
-                     pass their tests).
-
-                   - A batch for which ${a}$ and ${b}$ are fixed will
-                     establish that the operation of left-multiplying
-                     an element
-                     by $({a}*{b})$ is the composition of the operation
-                     of left-multiplying by ${a}$ with the operation
-                     of left-multiplying by ${b}$ (assuming all triples
-                     pass their tests).
-          
-
-                   - A batch for which ${b}$ and ${c}$ are fixed will
-                     establish that the operation of right-multiplying
-                     an element
-                     by $({b}*{c})$ is the composition of the operation
-                     of right-multiplying by ${c}$ with the operation
-                     of right-multiplying by ${b}$ (assuming all triples
-                     pass their tests).
-
-                By organizing the triples into batches in this manner,
-                we will be able to keep track of our knowledge, and
-                eventually conclude with certainty that the table defines
-                a group (assuming all triples pass their tests).
-
-                We will maintain a set $X$, such that we have established
-                that for any triple $({a},{b},{c})$ with both ${a},{c}$
-                in $X$, $({a}*{b})*{c}={a}*({b}*{c})$.
-                That is, for all ${a},{c}$ in $X$, left-multiplication
-                by ${a}$ commutes with right-multiplication by ${c}$.
-
-                As $X$ gets larger, the batches will get smaller,
-                since we can omit from the batch any triples
-                which start and end with elements of $X$.
-                
-                Once everything is in $X$,
-                we will know that associativity holds.
-                """)
-                self.X_string=r"$X=\{"+f"{self.element[identity]}"+r"\}$"
-                self.pause()
-            elif not self.test_mode:
-                st.write("Generating set "+self.S_string)
-                st.write("R"+self.roadmap_string[1:])
-                
-        nonidentity   =np.array(range(n))
-        nonidentity   =nonidentity[np.where(nonidentity!=identity)]
-
-        while self.batch_count < S_size*S_size:
-            i = self.batch_count // S_size
-            j = self.batch_count - S_size*i
-            self.batch_count=self.batch_count+1
-
-            s=S[i]
-            t=S[j]
-
-            if self.suppress_output:
-                if not self.test_mode:                
-                    st.write("----")
-            else:
-                # s row
-                self.row_colors[s]="yellow"
-                for j in range(0,n):
-                    self.cell_colors[s][j]="yellow"
-                
-                # t column
-                self.col_colors[t]="yellow"
-                for i in range(0,n):
-                    self.cell_colors[i][t]="yellow"
-                    
-                self.print_status()
-
-                # then make it plain colors again
-                # s row
-                self.row_colors[s]=self.plain
-                for j in range(0,n):
-                    self.cell_colors[s][j]=self.plain
-                
-                # t column
-                self.col_colors[t]=self.plain
-                for i in range(0,n):
-                    self.cell_colors[i][t]=self.plain
-                
-                st.write(f"## Checking triples, batch {self.batch_count}")
-                st.write(f"{self.X_string}")
-                st.write(f"""
-                For any ${a},{b}$ in $X$,
-                left multiplication by ${a}$
-                commutes with right multiplication by ${b}$.
-                
-                Checking whether left multiplication by ${self.element[s]}$ commutes
-                with right multiplication by ${self.element[t]}$: 
-                """)
-                
-            # check all s,g,t triples for g != identity
-            if not self.test_mode:
-                for g in range(self.n):
-                    if not g == identity:
-                        if not self.check_triple(s,g,t):
-                            self.failed_triple_type='S'
-                            return False
-
-            else: # avoid function call overhead in test_mode
-                g=nonidentity
-                sg=op[s][g]
-                gt=opT[t][g]
-                sg_t=opT[t][sg]
-                s_gt=op[s][gt]
-                self.number_of_triples=self.number_of_triples+n-1
-                if not (sg_t==s_gt).all():
-                    g_bad=g[np.where(sg_t!=s_gt)][0]
-                    self.failed_triple=[element[s],element[g_bad],element[t]]
-                    self.failed_triple_type='S'
-                    return False                    
-                
-            if (s==t) and (not self.suppress_output):
-                self.X_string=self.X_string[:-3]+f",{self.element[s]}"+r"\}$"
-
-            if (self.batch_count == S_size*S_size) and (len(roadmap)==0):
-                if not self.test_mode:
-                    st.write(f"""
-                    ----
-                
-                    All {self.number_of_triples} required triples check out!!! This is a group table.
-                    """)
-                return True
-            else:    
-                if not self.suppress_output:
-                    self.pause()
-
-        roadmap_length=len(roadmap)
-        roadmap_z     =np.array([roadmap[i]['z'] for i in range(roadmap_length)])
-        
-        while self.batch_count < S_size*S_size+2*roadmap_length:
-            # now we check triples based on the road map
-            # two batches per equation
-            roadmap_index    =  self.batch_count - S_size*S_size
-            parity           =  roadmap_index%2
-            roadmap_index    =  (roadmap_index-parity)//2
-
-            self.batch_count = self.batch_count + 1
-            
-            equation=roadmap[roadmap_index]
-            x = equation['x']
-            y = equation['y']
-            z = equation['z']
-                
-            if self.suppress_output:
-                if not self.test_mode:
-                    st.write("----")
-            else:
-                if parity==0:
-                    # batch is x * y * g triples
-                    # so highlight x,y,z rows
-                    for l in [x,y,z]:
-                        self.row_colors[l]="yellow"
-                        for m in range(0,n):
-                            self.cell_colors[l][m]="yellow"
-                        
-                    self.print_status()
-                
-                    # make table plain again
-                    for l in [x,y,z]:
-                        self.row_colors[l]=self.plain
-                        for m in range(0,n):
-                            self.cell_colors[l][m]=self.plain
-                            
-                            
-                else: 
-                    # batch is g * x * y triples
-                    # so highlight x,y,z columns                    
-                    for l in [x,y,z]:
-                        self.col_colors[l]="yellow"
-                        for m in range(0,n):
-                            self.cell_colors[m][l]="yellow"
-                            
-                    self.print_status()
-                
-                    # make table plain again
-                    for l in [x,y,z]:
-                        self.col_colors[l]=self.plain
-                        for m in range(0,n):
-                            self.cell_colors[m][l]=self.plain
-                        
-                st.write(f"## Checking triples, batch {self.batch_count}")
-                st.write(f"{self.X_string}")
-                st.write(f"""
-                For any ${a},{b}$ in $X$,
-                left multiplication by ${a}$
-                commutes with right multiplication by ${b}$.
-                """)
-            
-            if parity==0:
-                if not self.suppress_output:                
-                    st.write(f"""
-                    Working with Roadmap equation
-                    ${self.element[x]}*{self.element[y]}={self.element[z]}$:
-                    
-                    Checking whether left multiplication by
-                    ${self.element[z]}$ is the composition of left
-                    multiplication by ${self.element[x]}$ and left
-                    multiplication by ${self.element[y]}$. If this
-                    checks out, we will have established left
-                    multiplication by ${self.element[z]}$ commutes
-                    with right multiplication by elements of $X$.
-                    
-                    We have that ${self.element[x]}$ is in $X$. We
-                    must check all triples
-                    $({self.element[x]},{self.element[y]},{c})$ with
-                    ${c}$ not in $X$, since for ${c}$ in $X$ we know
-                    that left multiplication by ${self.element[x]}$
-                    commutes with right multiplication by ${c}$.
-                    """)
-
-                if not self.test_mode:
-                    for j in range(roadmap_index,roadmap_length):
-                        z_j = roadmap[j]['z']
-                        if not self.check_triple(x,y,z_j,ab=z):
-                            self.failed_triple_type='roadmap left'
-                            return False
-                else:
-                    z_j=roadmap_z[range(roadmap_index,roadmap_length)]
-
-                    zz_j   = op[z][z_j]
-                    yz_j   = op[y][z_j]
-                    x_yz_j = op[x][yz_j]
-                    self.number_of_triples=self.number_of_triples+roadmap_length-roadmap_index
-                    if not (zz_j==x_yz_j).all():
-                        z_bad=z_j[np.where(zz_j!=x_yz_j)][0]
-                        self.failed_triple=[element[x],element[y],element[z_bad]]
-                        self.failed_triple_type='roadmap left'
-                        return False
-                            
-
-                if not self.suppress_output:                    
-                    self.pause()
-                
-            else:
-                if not self.suppress_output:        
-                    st.write(f"""
-                    Working with Roadmap equation ${self.element[x]}*{self.element[y]}={self.element[z]}$:
-                    
-                    Checking whether right multiplication by ${self.element[z]}$ is
-                    the composition of right multiplication by ${self.element[y]}$ and
-                    right multiplication by ${self.element[x]}$. If this checks out,
-                    we will have established right multiplication by ${self.element[z]}$
-                    commutes with left multiplication by elements
-                    of $X$ and also with left multiplication by ${self.element[z]}$.
-                    Thus, we will be able to add ${self.element[z]}$ to $X$
-                    
-                    We have that ${self.element[y]}$ is in $X$. We only check
-                    triples $({a},{self.element[x]},{self.element[y]})$ with ${a}$ not in $X$,
-                    since for ${a}$ in $X$ we know that left multiplication
-                    by ${a}$ commutes with right multiplication by ${self.element[y]}$.
-                    
-                    But we just established (in the previous batch) that
-                    left multiplication by ${self.element[z]}$ commutes with right
-                    multiplication by ${self.element[y]}$: we don't need to check
-                    ${a}={self.element[z]}$.
-                    
-                    """)
-                    
-                if roadmap_index+1 < roadmap_length:
-                    if not self.test_mode:
-                        for j in range(roadmap_index+1,roadmap_length):
-                            z_j = roadmap[j]['z']
-                            if not self.check_triple(z_j,x,y,bc=z):
-                                self.failed_triple_type='roadmap right'
-                                return False
-                    else:
-                        z_j=roadmap_z[range(roadmap_index+1,roadmap_length)]
-
-                        z_jz   = opT[z][z_j]
-                        z_jx   = opT[x][z_j]
-                        z_jx_y = opT[y][z_jx]
-                        self.number_of_triples=self.number_of_triples+roadmap_length-roadmap_index-1
-                        if not (z_jz==z_jx_y).all():
-                            z_bad=z_j[np.where(z_jz!=z_jx_y)][0]
-                            self.failed_triple=[element[z_bad],element[x],element[y]]
-                            self.failed_triple_type='roadmap right'
-                            return False
-                            
-                    if not self.suppress_output:                    
-                        self.X_string=self.X_string[:-3]+f",{self.element[z]}"+r"\}$"
-                        self.pause()
-
-                else:
-                    if not self.suppress_output:                    
-                        st.write(f"""
-                        There are no triples to check!!!
-                        We may add ${self.element[z]}$ to $X$!
-
-                        Every element is now in $X$!!!
-                        """)
-                        
-                    if not self.test_mode:
-                        st.write(f"All {self.number_of_triples} required triples check out!!! This is a group table.")
-                    return True
-
-                
-        
-        # should only get here with a 1 x 1 table
-        if not self.test_mode:
-            st.write("This is a group table")
-        return True
-        
-    def test_table(self):
-
-        timings={}
-        if not (self.introduced or self.test_mode):
-            self.intro()
-
-
-        if not hasattr(self,"closed"):
-            start_time=time.process_time()                        
-            if not self.test_closure():
-                return {'is_group':False,
-                        'failed_property':'closure',
-                        'failed_product':self.failed_product
-                        }
-            timings['closure']=time.process_time()-start_time
-            if not self.suppress_output:
-                self.pause()
-
-        if not hasattr(self,"identity"):
-            start_time=time.process_time()                        
-            if not self.test_identity():
-                return {'is_group':False,
-                        'failed_property':'identity'
-                        }
-            timings['identity']=time.process_time()-start_time
-            if not self.suppress_output:
-                self.pause()
-
-        if not hasattr(self,"inverse"):
-            start_time=time.process_time()                        
-            if not self.test_inverses():
-                return {'is_group':False,
-                        'failed_property':'inverses',
-                        'failed_inverse':self.failed_inverse
-                        }
-            timings['inverse']=time.process_time()-start_time
-            if not self.suppress_output:
-                self.pause()
-
-        
-        if (len(self.H) < self.n) or (not hasattr(self,"found_roadmap")):
-            start_time=time.process_time()                        
-            if not self.find_roadmap():
-                return {'is_group':False,
-                        'failed_property':'associativity',
-                        'failed_triple':self.failed_triple,
-                        'failed_triple_type':self.failed_triple_type,
-                        'number_of_triples':self.number_of_triples
-                        }
-            timings['roadmap']=time.process_time()-start_time
-            if not self.suppress_output:
-                self.pause()
-
-        start_time=time.process_time()
-        if not self.test_triples():
-            return {'is_group':False,
-                    'failed_property':'associativity',
-                    'failed_triple':self.failed_triple,
-                    'failed_triple_type':self.failed_triple_type,
-                    'number_of_triples':self.number_of_triples
-                    }
-        else:
-            timings['triples']=time.process_time()-start_time
-            return {'is_group':True,
-                    'number_of_triples':self.number_of_triples,
-                    'generators':list(self.S),
-                    'identity':self.identity,
-                    'inverse':self.inverse,
-                    'roadmap':list(self.roadmap),
-                    'timings':timings
-                    }
-            
 
 
 
@@ -1710,336 +563,54 @@ def test_mode():
                'roadmap left':0,
                'roadmap right':0}
 
-    def random_perm(n):
-        pi=np.array(range(n))
-        for i in range(n-1):
-            j=np.random.randint(low=i,high=n)
-            tmp=pi[i]
-            pi[i]=pi[j]
-            pi[j]=tmp
-        return(pi)
-
-    def permute(X):
-        n=len(X['elts'])
-        pi=random_perm(n)
-        if X['elts']==list(range(n)):
-            identity=np.array(range(n))
-            pi_inverse=identity.copy()
-            pi_inverse[pi]=identity
-            Y={
-                'table':pi_inverse[X['table'][pi].T[pi].T],
-                'elts':X['elts']
-            }
-        else:
-            Y={
-                'table':X['table'][pi].T[pi].T,
-                'elts':[X['elts'][i] for i in pi]
-            }
-            
-        return Y
+    def tester(X,summary):
+        # tables checked before, by any session, are not checked again
+        results,process_time=table_cache.check(X)
+        st.write(summary_line(X,results,process_time,summary))
+        return process_time
 
-    def tester(X,summary,update_histogram=False):
-        start_time=time.process_time()
-        G=group_table_checker(
-            X['elts'],
-            X['table'],
-            test_mode=True,
-        )
-        results = G.test_table()
-        process_time=time.process_time()-start_time
-        n=len(X['elts'])
-        if not update_histogram:
-            summary=summary+f"{n}x{n} table, is_group={results['is_group']}, "
-            if results['is_group']:
-                k=len(results['generators'])
-                num_triples=results['number_of_triples']
-                ok=num_triples==(n-k-1)*(n-k-1)+(n-1)*k*k
-                summary=summary+f" k={k}, number of triples = {num_triples}, time={process_time}"#, ok={ok}, timing={results['timings']}"
-            else:  # failed_property is one of
-                # ['closure','identity','inverses','associativity']
-                failed=results['failed_property']
-                summary=summary+f"failed:{failed}"
-                if failed=='closure':
-                    summary=summary+f": {results['failed_product']}"
-                elif failed=='inverses':
-                    summary=summary+f": {results['failed_inverse']}"
-                elif failed=='associativity':
-                    # failed triple is one of these types:
-                    # ['right inverse', 'left inverse', 'x inverse roadmap',
-                    #  'x roadmap', 'xH', 'S', 'roadmap left', 'roadmap right']
-                    summary=summary+f": {results['number_of_triples']}. {results['failed_triple']} ({results['failed_triple_type']})"
-                    
-            st.write(summary)
-        else: #update histogram on various aspects of result
-              #use for tables known to have closure, identity, inverses
-            if not results['is_group']:
-                if results['failed_property']=='associativity':
-                    rslts=f"{results['failed_triple_type']}"
-                    histogram[rslts]=histogram[rslts]+1
-            else:
+    # add the results for a stack of tables to the histogram (use
+    # for tables known to have closure, identity, inverses)
+    def stack_tester(X):
+        results,process_time=table_cache.check_tables(X)
+        for is_group,failed,failed_type in zip(results['is_group'],
+                                               results['failed_property'],
+                                               results['failed_triple_type']):
+            if is_group:
                 histogram['group']=histogram['group']+1
-                    
+            elif failed=='associativity':
+                histogram[failed_type]=histogram[failed_type]+1
         return process_time
 
-
-    def RS_test(X):
-        elements=X['elts']
-        n=len(elements)
-        table=X['table']
-
-        if not elements==list(range(n)):
-            raise ValueError(f"elements are not range({n})")
-        
-        def RS_prod(U,V):
-            H=np.zeros((n),dtype=int)
-            for u in U:
-                H[table[u,V]]+=1
-            return np.where(H%2>0)[0]
-
-        A=np.where(np.random.randint(low=0,
-                                     high=2,
-                                     size=n)>0)[0]
-        
-        B=np.where(np.random.randint(low=0,
-                                     high=2,
-                                     size=n)>0)[0]
-        
-        C=np.where(np.random.randint(low=0,
-                                     high=2,
-                                     size=n)>0)[0]
-        
-        AB=RS_prod(A,B)
-        BC=RS_prod(B,C)
-        AB_C=RS_prod(AB,C)
-        A_BC=RS_prod(A,BC)
-        return (len(AB_C)==len(A_BC)) and (AB_C==A_BC).all()           
-    
-    
-    # check if a closed table with elements list(range(n)) is a latin square
-    def latin_square(X):
-        elements=X['elts']
-        n=len(elements)
-        table=X['table']
-        if not elements==list(range(n)):
-            raise ValueError(f"elements are not range({n})")
-
-        H=np.zeros((n,n),dtype=int)
-        for i in range(n):
-            H[i][table[i]]+=1
-        if H.min()==0:
-            return False
-
-        tableT=table.T
-        for i in range(n):
-            H[i][tableT[i]]+=1
-        if H.min()==1:
-            return False
-        return True
-        
-            
-    # check a closed table with elements list(range(n))
-    # returns False if no identity, no inverse, or
-    # failed triple (x,x_inverse,a) or (a,x,x_inverse)
-    # has x_inverse * (x * a) = a and
-    #     (a * x) * x_inverse = a 
-    def latin_square_combo(X):
-        table=X['table']
-        elements=X['elts']
-        n=len(elements)
-        if not elements==list(range(n)):
-            raise ValueError(f"elements are not range({n})")
-        a=0
-        indices=np.where(table[0]==a)
-        if not len(indices)==1:
-            return False # should be unique index
-        id=indices[0][0]
-        if not (table[id]==elements).all():
-            return False #not a left identity
-        id_col=table[:,id]
-        if not (id_col==elements).all():
-            return False #not a right identity
-
-        table_transpose=table.T
-        
-        done={}    
-        for a in elements:
-            if not a in done:
-                indices=np.where(table[a]==id)
-                if not len(indices)==1:
-                    return False # should be unique index
-                a_inv=indices[0][0]
-                left=table[a][table[a_inv]]
-                if not (left==elements).all():
-                    return False
-#                right=table[:,a][table[:,a_inv]]
-                right=table_transpose[a_inv][table_transpose[a]]
-
-
-                if not (right==elements).all():
-                    return False
-
-                done[a]=True
-                done[a_inv]=True
-        return True
-    
-
-    
-    def perm_enum(x,n):
-        rho=list(range(n))
-        for i in range(n-2,-1,-1):
-            j = i + x%(n-i)
-            x = x // (n-i)
-            tmp=rho[i]
-            rho[i]=rho[j]
-            rho[j]=tmp
-        return rho
-
-    def perm_index(x):
-        rho=x.copy()
-        n=len(rho)
-        x=0
-        for i in range(n):
-            j=rho.index(i)
-            tmp=rho[i]
-            rho[i]=rho[j]
-            rho[j]=tmp
-            x=x*(n-i)+j-i
-        return(x)
-
-    def perm_mult(rho,sigma):
-        return [rho[i] for i in sigma]
-
-    def symmetric_group(k):
-        n=math.factorial(k)
-        pi=random_perm(n)
-        pi_inverse=list(range(n))
-        for i in range(n):
-            pi_inverse[pi[i]]=i
-
-        elements=list(range(n))
-        table=np.zeros((n,n),dtype=int)
-
-        alpha=list(range(k))
-        alpha[0]=1
-        alpha[1]=0
-
-        a=pi[perm_index(alpha)] 
-        for j in range(n):
-            rho=perm_enum(pi_inverse[j],k)
-            sigma=perm_mult(alpha,rho)
-            t=perm_index(sigma)
-            table[a,j]=pi[t]
-
-        beta=list(range(1,k+1))
-        beta[k-1]=0
-        b=pi[perm_index(beta)]
-        for j in range(n):
-            rho=perm_enum(pi_inverse[j],k)
-            sigma=perm_mult(beta,rho)
-            t=perm_index(sigma)
-            table[b,j]=pi[t]
-
-        Q=[a,b]
-        while len(Q) > 0:
-            x=Q.pop()
-            ax=table[a][x]
-            bx=table[b][x]
-            if table[ax].max() == 0:
-                table[ax]=table[a][table[x]]
-                Q.append(ax)
+    # the line tester writes for the table X
+    def summary_line(X,results,process_time,summary):
+        n=len(X['elts'])
+        summary=summary+f"{n}x{n} table, is_group={results['is_group']}, "
+        if results['is_group']:
+            k=len(results['generators'])
+            num_triples=results['number_of_triples']
+            ok=num_triples==(n-k-1)*(n-k-1)+(n-1)*k*k
+            summary=summary+f" k={k}, number of triples = {num_triples}, time={process_time}"#, ok={ok}, timing={results['timings']}"
+        else:  # failed_property is one of
+            # ['closure','latin square','identity','inverses','associativity']
+            failed=results['failed_property']
+            summary=summary+f"failed:{failed}"
+            if failed=='closure':
+                summary=summary+f": {results['failed_product']}"
+            elif failed=='inverses':
+                summary=summary+f": {results['failed_inverse']}"
+            elif failed=='latin square':
+                # a*b=a*c ('row') or a*c=b*c ('column')
+                summary=summary+f": {results['failed_triple']} ({results['failed_triple_type']})"
+            elif failed=='associativity':
+                # failed triple is one of these types:
+                # ['right inverse', 'left inverse', 'x inverse roadmap',
+                #  'x roadmap', 'xH', 'S', 'roadmap left', 'roadmap right',
+                #  'random subsets']
+                summary=summary+f": {results['number_of_triples']}. {results['failed_triple']} ({results['failed_triple_type']})"
                 
+        return summary
 
-            if table[bx].max() == 0:
-                table[bx]=table[b][table[x]]
-                Q.append(bx)
-
-        return {
-            'table': table,
-            'elts': elements
-            }
-
-    def elementary_two_group(k):
-        n=1<<k;
-        elements=list(range(n))
-        x=np.array(elements)
-        table=np.zeros((n,n),dtype=int)
-        for i in range(n):
-            table[i]=i^x
-        return {
-            'table': table,
-            'elts': elements
-            }
-
-    # find an element x of order 2
-    # swap entries in a,a*x rows intersect b,x*b column
-    def table_tweak(T):
-        elements=T['elts']
-        table=T['table']
-        n=len(elements)
-        if not (n%2==0):
-            raise ValueError(f"the order {n} is not even")
-        if not elements==list(range(n)):
-            raise ValueError(f"elements are not range({n})")
-        a=0
-        indices=np.where(table[0]==a)
-        if not len(indices)==1:
-            return False # should be unique index
-        id=indices[0][0]
-
-        x=np.random.randint(low=0,high=n)
-        while (table[x][x]!=id) or (x==id):
-            x=np.random.randint(low=0,high=n)
-
-        a=np.random.randint(low=0,high=n)
-        while (a==x) or (a==id):
-            a=np.random.randint(low=0,high=n)
-            
-        b=np.random.randint(low=0,high=n)
-        while (b==x) or (b==id) or (table[a][b]==id) or (table[b][a]==x):
-            b=np.random.randint(low=0,high=n)
-        
-        ax=table[a][x]
-        xb=table[x][b]
-        ab=table[a][b]
-        axb=table[ax][b]
-
-        table[a][b]=axb
-        table[a][xb]=ab
-        table[ax][b]=ab
-        table[ax][xb]=axb
-
-
-    
-    def random_table(n):
-        elements=list(range(n))
-        table=[]
-        for i in range(n):
-            table.append([])
-            for j in range(n):
-                table[i].append(np.random.randint(low=0,high=n))
-        id=np.random.randint(low=0,high=n)
-        for i in range(n):
-            table[i][id]=i
-            table[id][i]=i
-        
-        available={}
-        for i in range(n):
-            available[i]=True
-
-        del available[id]
-        while len(available)>0:
-            i=np.random.choice(list(available.keys()))
-            j=np.random.choice(list(available.keys()))
-            table[i][j]=id
-            table[j][i]=id
-            del available[i]
-            if not (i==j):
-                del available[j]
-        return {
-            'table': np.array(table),
-            'elts': elements
-            }
-                
 
     def basic_diagnostics():
         quaternions={
@@ -2124,30 +695,98 @@ def test_mode():
         X=permute(no_inverses)
         tester(X,"without inverses: ")
 
-        X=random_table(125)
+        # The larger random tables are seeded, so that they (and their
+        # results) are built once and then found in table_cache.
+        X=table_cache.workload_table("random",(125,),0,
+                                     lambda rng: random_table(125,rng))
         tester(X,"random: ")
         
+        # The 10000 tables of each kind are checked as one stack by
+        # checker.check_stack.  Like the larger random table, they are
+        # seeded and kept in table_cache, with their results.
+        def stack(make,count):
+            def make_stack(rng):
+                tables=[make(rng) for i in range(count)]
+                return {
+                    'table': np.stack([X['table'] for X in tables]),
+                    'elts': tables[0]['elts']
+                    }
+            return make_stack
+
         st.write("trying 10000 random 25x25 tables (satisfying closure, identity, and inverses)")
         
-        for i in range(10000):
-            X=random_table(25)
-            tester(X,"random: ",update_histogram=True)
+        X=table_cache.workload_table("random stack",(25,10000),0,
+                                     stack(lambda rng: random_table(25,rng),10000))
+        stack_tester(X)
         st.write(histogram)
 
         st.write("trying 10000 24x24 tables (latin squares which are off from a group table in four squares")
             
-        for i in range(10000):
-            X=symmetric_group(4)
-            table_tweak(X)
-            tester(X,"latin: ",update_histogram=True)
+        X=table_cache.workload_table("tweaked Sym stack",(4,10000),0,
+                                     stack(lambda rng: table_tweak(symmetric_group(4,rng),rng),10000))
+        stack_tester(X)
         st.write(histogram)
         
         done=st.button("Return to diagnostics menu",type="primary")
         st.stop()
 
+    # the tables timed by time_test, in order, as (name, family,
+    # parameter, make(parameter,rng))
+    timing_tables=[
+        ("(Z_2)^4: ",  "(Z_2)^k", 4,  lambda k,rng: elementary_two_group(k)),
+        ("Sym(4): ",   "Sym",     4,  symmetric_group),
+        ("(Z_2)^5: ",  "(Z_2)^k", 5,  lambda k,rng: elementary_two_group(k)),
+        ("(Z_2)^6: ",  "(Z_2)^k", 6,  lambda k,rng: elementary_two_group(k)),
+        ("Sym(5): ",   "Sym",     5,  symmetric_group),
+        ("(Z_2)^7: ",  "(Z_2)^k", 7,  lambda k,rng: elementary_two_group(k)),
+        ("(Z_2)^8: ",  "(Z_2)^k", 8,  lambda k,rng: elementary_two_group(k)),
+        ("(Z_2)^9: ",  "(Z_2)^k", 9,  lambda k,rng: elementary_two_group(k)),
+        ("Sym(6): ",   "Sym",     6,  symmetric_group),
+        ("(Z_2)^10: ", "(Z_2)^k", 10, lambda k,rng: elementary_two_group(k)),
+        ("(Z_2)^11: ", "(Z_2)^k", 11, lambda k,rng: elementary_two_group(k)),
+        ("(Z_2)^12: ", "(Z_2)^k", 12, lambda k,rng: elementary_two_group(k)),
+        ("Sym(7): ",   "Sym",     7,  symmetric_group),
+        ]
+
+    #----------------------------------------------------------------#
+    # Runs in a background thread, so must not call streamlit: the
+    # script thread shows job['lines'] and the progress of
+    # job['checker'] on each rerun.  Times are the thread's processor
+    # time, which leaves out the script thread.
+    def timing_job(job):
+        for name,family,k,make in timing_tables:
+            if job['cancelled']:
+                break
+            job['current']=name
+            job['checker']=None
+            # tables and timings are kept in table_cache, so that only
+            # the first visit (by any session) builds and checks them
+            X=table_cache.workload_table(family,(k,),0,
+                                         lambda rng: make(k,rng))
+            cached=table_cache.cached_results(X)
+            if cached is not None:
+                results,process_time=cached
+            else:
+                G=checker.group_table_checker(
+                    X['elts'],
+                    X['table'],
+                    test_mode=True,
+                )
+                job['checker']=G
+                if job['cancelled']:
+                    break
+                start_time=time.thread_time()
+                try:
+                    results=G.test_table()
+                except checker.Cancelled:
+                    break
+                process_time=time.thread_time()-start_time
+                table_cache.store_results(X,results,process_time)
+            job['lines'].append(summary_line(X,results,process_time,name))
+            job['timings'].append(process_time)
+            job['orders'].append(len(X['elts']))
+
     def time_test():
-        timings = []
-        orders  = []
         st.write("""
         ### Timing results on large tables
 
@@ -2159,93 +798,65 @@ def test_mode():
         Note that the larger groups will take some time.
         """)
 
-        X=elementary_two_group(4)
-        timings.append(tester(X,"(Z_2)^4: "))
-        orders.append(16)
-        
-        X=symmetric_group(4)
-        timings.append(tester(X,"Sym(4): "))
-        orders.append(24)
-        
-        X=elementary_two_group(5)
-        timings.append(tester(X,"(Z_2)^5: "))
-        orders.append(32)
-        
-        X=elementary_two_group(6)
-        timings.append(tester(X,"(Z_2)^6: "))
-        orders.append(64)
-        
-        X=symmetric_group(5)
-        timings.append(tester(X,"Sym(5): "))
-        orders.append(120)
-
-        X=elementary_two_group(7)
-        timings.append(tester(X,"(Z_2)^7: "))
-        orders.append(128)
-        
-        X=elementary_two_group(8)
-        timings.append(tester(X,"(Z_2)^8: "))
-        orders.append(256)
-
-        X=elementary_two_group(9)
-        timings.append(tester(X,"(Z_2)^9: "))
-        orders.append(512)
-        
-        X=symmetric_group(6)
-        timings.append(tester(X,"Sym(6): "))
-        orders.append(720)
+        # the tests run in the background, and we rerun this every
+        # half second to show how far they have got
+        if 'timing_job' not in st.session_state:
+            job={'lines':[],'timings':[],'orders':[],
+                 'current':None,'checker':None,'cancelled':False}
+            job['thread']=threading.Thread(target=timing_job,args=(job,),daemon=True)
+            job['thread'].start()
+            st.session_state.timing_job=job
+        job=st.session_state.timing_job
+
+        for line in job['lines']:
+            st.write(line)
+
+        if job['thread'].is_alive():
+            G=job['checker']
+            if G is None:
+                phase,fraction="building the table",0.0
+            else:
+                phase,fraction=G.progress()
+            # estimate the time left in this phase from how long it
+            # has taken so far
+            if job.get('phase')!=(job['current'],phase):
+                job['phase']=(job['current'],phase)
+                job['phase_start']=time.time()
+            text=f"{job['current']}{phase}"
+            if fraction > 0:
+                elapsed=time.time()-job['phase_start']
+                text=text+f", about {elapsed*(1-fraction)/fraction:.0f}s left"
+            st.progress(fraction,text=text)
+
+            if job['cancelled'] or st.button("Cancel"):
+                job['cancelled']=True
+                if G is not None:
+                    G.cancel()
+                st.write("Cancelling...")
+            time.sleep(0.5)
+            st.rerun()
+
+        del st.session_state.timing_job
+        if job['cancelled']:
+            st.write("Cancelled.")
+        elif len(job['timings']) > 2:
+            timings=np.array(job['timings'])
+            orders=np.array(job['orders'])
+            fig,ax = plt.subplots()
+            ax.set_xlabel("Order of group")
+            ax.set_ylabel("Time (sec)")
+            ax.scatter(orders,timings,s=60,alpha=0.7,edgecolors="k")
+            c,b,a = np.polyfit(orders,timings,deg=2)
+            xseq=np.linspace(0,5040,num=100)
+            ax.plot(xseq,a+b*xseq+c*xseq*xseq,color="k",lw=2.5)
+            C=round(1000000*c,3)
+            st.write(f"""
+            ### Summary of results
 
-        X=elementary_two_group(10)
-        timings.append(tester(X,"(Z_2)^10: "))
-        orders.append(1024)
-        
-        X=elementary_two_group(11)
-        timings.append(tester(X,"(Z_2)^11: "))
-        orders.append(2048)
-        
-        X=elementary_two_group(12)
-        timings.append(tester(X,"(Z_2)^12: "))
-        orders.append(4096)
-        
-#        start_time=time.process_time()
-        X=symmetric_group(7)
-#        construction_time=time.process_time()-start_time
-
-#        start_time=time.process_time()
-#        latin_test = latin_square(X)
-#        latin_time=time.process_time()-start_time
-
-#        start_time=time.process_time()
-#        latin_test_combo= latin_square_combo(X)
-#        latin_combo_time=time.process_time()-start_time
-        timings.append(tester(X,"Sym(7): "))
-        orders.append(5040)
-
-        timings=np.array(timings)
-        orders=np.array(orders)
-        fig,ax = plt.subplots()
-        ax.set_xlabel("Order of group")
-        ax.set_ylabel("Time (sec)")
-        ax.scatter(orders,timings,s=60,alpha=0.7,edgecolors="k")
-        c,b,a = np.polyfit(orders,timings,deg=2)
-        xseq=np.linspace(0,5040,num=100)
-        ax.plot(xseq,a+b*xseq+c*xseq*xseq,color="k",lw=2.5)
-        C=round(1000000*c,3)
-        st.write(f"""
-        ### Summary of results
-
-        Time is approximately ${C}$ microseconds per table entry.
-        """)
-        st.pyplot(fig)
-        plt.close(fig)
-        
-#        st.write(f", ")
-#        st.write(f"""
-#        For Sym(7): breakdown of computation time:
-#          - construction of group table         : {construction_time}
-#          - test if table is latin square       : {latin_time}
-#          - new method test (all properties)    : {timings[trials-1]}
-#        """)
+            Time is approximately ${C}$ microseconds per table entry.
+            """)
+            st.pyplot(fig)
+            plt.close(fig)
         
         done=st.button("Return to main menu",type="primary")
         if 'current_task' in st.session_state:
@@ -2273,7 +884,10 @@ def test_mode():
         timing,
         main
     ]
-    if 'test_go' in st.session_state and st.session_state.test_go:
+    if 'timing_job' in st.session_state:
+        # timing tests running in the background
+        time_test()
+    elif 'test_go' in st.session_state and st.session_state.test_go:
         option=st.session_state.test_option
         del st.session_state.test_go
         if option==basic:
@@ -0,0 +1,140 @@
+import collections
+import hashlib
+import threading
+import time
+import numpy as np
+
+from group_table_checker import group_table_checker, index_dtype, check_stack
+
+# Process-wide caches for the app's test mode.  Streamlit reruns the
+# app script from the top on every interaction, but imported modules
+# stay loaded, so these caches survive reruns and are shared by every
+# session (and by the timing thread):
+#
+# * workload tables, keyed by family, parameters and seed.  They are
+#   stored read-only, as integer tables in the narrowest index dtype.
+#
+# * the results of checking a table, or a (B,n,n) stack of tables,
+#   with the time the check took, keyed by a hash of the contents.
+#
+# Both are bounded, forgetting the least recently used entries first.
+# Entries are shared, so callers must not modify them.
+
+#--------------------------------------------------------------------#
+# a dictionary holding values of total size at most max_size, where
+# the size of a value is size(value)
+class bounded_cache(object):
+    def __init__(self,max_size,size=lambda value: 1):
+        self.max_size = max_size
+        self.size     = size
+        self.total    = 0
+        self.entries  = collections.OrderedDict()
+        self.lock     = threading.Lock()
+        # an event for each key being computed, so that sessions
+        # asking for the same missing entry compute it once, while
+        # other keys go ahead
+        self.pending  = {}
+
+    def get(self,key):
+        with self.lock:
+            if not key in self.entries:
+                return None
+            self.entries.move_to_end(key)
+            return self.entries[key]
+
+    def put(self,key,value):
+        with self.lock:
+            if key in self.entries:
+                self.total=self.total-self.size(self.entries.pop(key))
+            self.entries[key]=value
+            self.total=self.total+self.size(value)
+            while (self.total > self.max_size) and (len(self.entries) > 1):
+                old_key,old=self.entries.popitem(last=False)
+                self.total=self.total-self.size(old)
+        return value
+
+    # If the computation fails, a waiting caller tries it again.
+    def get_or_compute(self,key,compute):
+        while True:
+            with self.lock:
+                if key in self.entries:
+                    self.entries.move_to_end(key)
+                    return self.entries[key]
+                event=self.pending.get(key)
+                if event is None:
+                    event=threading.Event()
+                    self.pending[key]=event
+                    break
+            event.wait()
+        try:
+            return self.put(key,compute())
+        finally:
+            with self.lock:
+                del self.pending[key]
+            event.set()
+
+workloads = bounded_cache(1<<28,size=lambda X: X['table'].nbytes)
+verdicts  = bounded_cache(1<<16)
+
+#--------------------------------------------------------------------#
+# a hash of the elements and entries of the table X
+def table_hash(X):
+    if 'hash' in X:
+        return X['hash']
+    table=np.ascontiguousarray(X['table'])
+    h=hashlib.sha256()
+    h.update(repr((table.shape,table.dtype.str,X['elts'])).encode())
+    if table.dtype.kind=='O':
+        h.update(repr(table.tolist()).encode())
+    else:
+        h.update(table.data)
+    return h.hexdigest()
+
+#--------------------------------------------------------------------#
+# The table X=make(rng) of the given family and parameters (a tuple),
+# with rng=np.random.RandomState(seed), built once per process.
+def workload_table(family,params,seed,make):
+    def build():
+        X=make(np.random.RandomState(seed))
+        table=np.asarray(X['table'])
+        if table.dtype.kind in 'iu':
+            table=table.astype(index_dtype(len(X['elts'])))
+        table.flags.writeable=False
+        Y={
+            'table': table,
+            'elts': X['elts']
+            }
+        Y['hash']=table_hash(Y)
+        return Y
+    return workloads.get_or_compute((family,params,seed),build)
+
+#--------------------------------------------------------------------#
+# (results,seconds) from an earlier check of a table with the same
+# contents as X, or None
+def cached_results(X):
+    return verdicts.get(table_hash(X))
+
+def store_results(X,results,seconds):
+    return verdicts.put(table_hash(X),(results,seconds))
+
+#--------------------------------------------------------------------#
+# (results,seconds) for checking X in test mode, where seconds is the
+# processor time the check took, checking X only if its contents have
+# not been checked before
+def check(X):
+    def compute():
+        start_time=time.thread_time()
+        G=group_table_checker(X['elts'],X['table'],test_mode=True)
+        results=G.test_table()
+        return results,time.thread_time()-start_time
+    return verdicts.get_or_compute(table_hash(X),compute)
+
+#--------------------------------------------------------------------#
+# the same for a stack X['table'] of tables with elements X['elts']
+# (which must be list(range(n))), checked by check_stack
+def check_tables(X):
+    def compute():
+        start_time=time.thread_time()
+        results=check_stack(X['table'])
+        return results,time.thread_time()-start_time
+    return verdicts.get_or_compute(table_hash(X),compute)
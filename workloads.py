@@ -0,0 +1,194 @@
+import itertools
+import math
+import numpy as np
+
+from group_table_checker import index_dtype
+
+# Tables for testing and timing the checker, as dictionaries
+#
+#   {'table': n x n array, 'elts': list of the n elements}
+#
+# like those in the app's test mode.  Except for permute, the elements
+# are list(range(n)), and the tables are integer arrays in the
+# narrowest index dtype, built with whole-array operations.
+#
+# Random choices come from rng, which is np.random or a seeded
+# np.random.RandomState(seed).
+
+#####################################################################
+# groups                                                            #
+#####################################################################
+
+#--------------------------------------------------------------------#
+# the integer table with entries table, and elements list(range(n))
+def integer_table(table):
+    n=table.shape[0]
+    return {
+        'table': table.astype(index_dtype(n),copy=False),
+        'elts': list(range(n))
+        }
+
+#--------------------------------------------------------------------#
+# the cyclic group Z_n, with i standing for i mod n
+def cyclic_group(n):
+    x=np.arange(n)
+    return integer_table(np.add.outer(x,x)%n)
+
+#--------------------------------------------------------------------#
+# the dihedral group of order 2m, with i standing for r^i and m+i for
+# s r^i, where r^m=s^2=1 and r s = s r^{-1}, so that
+#   (s^f r^i)(s^g r^j) = s^(f+g) r^(j +/- i)
+# with i negated when g=1
+def dihedral_group(m):
+    x=np.arange(2*m)
+    flip=x//m
+    rotation=x%m
+    sign=1-2*flip
+    product_flip=flip[:,None]^flip[None,:]
+    product_rotation=(rotation[:,None]*sign[None,:]+rotation[None,:])%m
+    return integer_table(product_flip*m+product_rotation)
+
+#--------------------------------------------------------------------#
+# the elementary abelian group (Z_p)^k, with i standing for the vector
+# of its k base p digits
+def elementary_abelian_group(p,k):
+    n=p**k
+    x=np.arange(n)
+    if p==2:
+        return integer_table(np.bitwise_xor.outer(x,x))
+    table=np.zeros((n,n),dtype=np.intp)
+    for i in range(k):
+        digit=(x//(p**i))%p
+        table=table+(np.add.outer(digit,digit)%p)*(p**i)
+    return integer_table(table)
+
+def elementary_two_group(k):
+    return elementary_abelian_group(2,k)
+
+symmetric_block_rows = 64
+
+#--------------------------------------------------------------------#
+# the group of permutations of k things, with i standing for the i-th
+# permutation in lexicographic order or (unless rng is None) in a
+# random order.  The product x y is y after x.
+def symmetric_group(k,rng=np.random):
+    n=math.factorial(k)
+    perms=np.array(list(itertools.permutations(range(k))),dtype=np.int32).reshape(n,k)
+    if rng is not None:
+        perms=perms[random_perm(n,rng)]
+    # a permutation's digits in base k, as a number, and the inverse
+    # of that map on the permutations
+    weights=k**np.arange(k-1,-1,-1,dtype=np.int32)
+    code_index=np.zeros(k**k,dtype=index_dtype(n))
+    code_index[perms@weights]=np.arange(n)
+    # (x y)[t] = y[x[t]], for a block of x and all y at once, one t at
+    # a time; rows of perms.T are gathered rather than columns of perms,
+    # and the blocks are small enough for the codes to stay in cache
+    columns=np.ascontiguousarray(perms.T)
+    table=np.empty((n,n),dtype=code_index.dtype)
+    for start in range(0,n,symmetric_block_rows):
+        x=perms[start:start+symmetric_block_rows]
+        code=columns[x[:,0]]*weights[0]
+        for t in range(1,k):
+            code+=columns[x[:,t]]*weights[t]
+        table[start:start+symmetric_block_rows]=code_index[code]
+    return integer_table(table)
+
+#--------------------------------------------------------------------#
+# the direct product of the groups X and Y, with elements list(range(n))
+# and list(range(m)), where i*m+j stands for (i,j)
+def direct_product(X,Y):
+    n=len(X['elts'])
+    m=len(Y['elts'])
+    if (X['elts']!=list(range(n))) or (Y['elts']!=list(range(m))):
+        raise ValueError("elements are not range(n)")
+    A=np.asarray(X['table'],dtype=np.intp)
+    B=np.asarray(Y['table'],dtype=np.intp)
+    table=A[:,None,:,None]*m+B[None,:,None,:]
+    return integer_table(table.reshape(n*m,n*m))
+
+#####################################################################
+# other tables                                                      #
+#####################################################################
+
+#--------------------------------------------------------------------#
+# a random permutation of 0..n-1
+def random_perm(n,rng=np.random):
+    return rng.permutation(n)
+
+#--------------------------------------------------------------------#
+# the same table with its elements renamed (or, when they are not
+# list(range(n)), reordered) by a random permutation
+def permute(X,rng=np.random):
+    n=len(X['elts'])
+    pi=random_perm(n,rng)
+    table=np.asarray(X['table'])
+    if X['elts']==list(range(n)):
+        pi_inverse=np.empty(n,dtype=np.intp)
+        pi_inverse[pi]=np.arange(n)
+        return {
+            'table': pi_inverse[table[np.ix_(pi,pi)]].astype(table.dtype),
+            'elts': X['elts']
+            }
+    return {
+        'table': table[np.ix_(pi,pi)],
+        'elts': [X['elts'][i] for i in pi]
+        }
+
+#--------------------------------------------------------------------#
+# A copy of the group table T, off from it in four entries: for an
+# element x of order 2 and elements a,b, swap the entries in rows a,
+# a*x and columns b, x*b.  The result is still a latin square with
+# the same identity, but is not associative.
+def table_tweak(T,rng=np.random):
+    elements=T['elts']
+    n=len(elements)
+    if not (n%2==0):
+        raise ValueError(f"the order {n} is not even")
+    if not elements==list(range(n)):
+        raise ValueError(f"elements are not range({n})")
+    table=np.array(T['table'])
+    indices=np.arange(n)
+    id=np.flatnonzero(table[0]==0)[0]
+
+    x=rng.choice(np.flatnonzero((table.diagonal()==id) & (indices!=id)))
+    a=rng.choice(np.flatnonzero((indices!=x) & (indices!=id)))
+    candidates=np.flatnonzero((indices!=x) & (indices!=id) &
+                              (table[a]!=id) & (table[:,a]!=x))
+    if len(candidates)==0:
+        raise ValueError(f"no entries to swap for a={a}, x={x}")
+    b=rng.choice(candidates)
+
+    ax=table[a,x]
+    xb=table[x,b]
+    ab=table[a,b]
+    axb=table[ax,b]
+
+    table[a,b]=axb
+    table[a,xb]=ab
+    table[ax,b]=ab
+    table[ax,xb]=axb
+    return {
+        'table': table,
+        'elts': elements
+        }
+
+#--------------------------------------------------------------------#
+# A random table with an identity and inverses: the entries are random
+# apart from the identity's row and column, and the entries i*j=j*i=id
+# for the pairs i,j of inverses, which are chosen as random pairs from
+# the elements not yet paired (possibly with i=j).
+def random_table(n,rng=np.random):
+    table=rng.randint(low=0,high=n,size=(n,n))
+    id=rng.randint(low=0,high=n)
+    table[:,id]=np.arange(n)
+    table[id]=np.arange(n)
+
+    available=np.delete(np.arange(n),id)
+    while len(available) > 0:
+        i=rng.randint(low=0,high=len(available))
+        j=rng.randint(low=0,high=len(available))
+        table[available[i],available[j]]=id
+        table[available[j],available[i]]=id
+        available=np.delete(available,[i,j])
+    return integer_table(table)